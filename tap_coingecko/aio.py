@@ -0,0 +1,150 @@
+"""Asyncio request engine for tap-coingecko."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import typing as t
+from concurrent.futures import Executor, Future
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from tap_coingecko.rate_limit import TokenBucket
+from tap_coingecko.response_cache import ResponseCache
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - exercised without the extra installed
+    aiohttp = None
+
+# Errors a request future of the engine re-raises when the transport fails.
+TRANSPORT_ERRORS: tuple[type[BaseException], ...] = (asyncio.TimeoutError,)
+if aiohttp is not None:
+    TRANSPORT_ERRORS += (aiohttp.ClientError,)
+
+
+class AsyncioEngine(Executor):
+    """Keep many GET requests in flight on one event loop running in a thread.
+
+    The engine is a `concurrent.futures.Executor` whose `submit` takes a
+    coroutine function, so it plugs into `PartitionPrefetcher` exactly like a
+    thread pool. Responses are handed back as undecoded `requests.Response`
+    objects: only the raw body of each in-flight request is held in memory and
+    JSON decoding happens on the consuming thread, one partition at a time.
+
+    Requires the optional `aiohttp` dependency (`pip install tap-coingecko[asyncio]`).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        timeout: float,
+        rate_limiter: TokenBucket,
+        response_cache: ResponseCache | None = None,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                "request_engine 'asyncio' requires aiohttp. "
+                "Install it with `pip install tap-coingecko[asyncio]`."
+            )
+
+        self._max_concurrency = max_concurrency
+        self._timeout = timeout
+        self._rate_limiter = rate_limiter
+        self._response_cache = response_cache
+        self._futures: set[Future] = set()
+        self._shutdown = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="tap-coingecko-asyncio", daemon=True
+        )
+        self._thread.start()
+        self._session = asyncio.run_coroutine_threadsafe(
+            self._open_session(), self._loop
+        ).result()
+
+    async def _open_session(self):
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self._max_concurrency)
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self._timeout),
+        )
+
+    def submit(self, fn: t.Callable[..., t.Awaitable], /, *args, **kwargs) -> Future:
+        """Schedule the coroutine function `fn` on the engine loop."""
+        future = asyncio.run_coroutine_threadsafe(fn(*args, **kwargs), self._loop)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    async def get(
+        self,
+        url: str,
+        context: dict | None = None,
+        *,
+        headers: dict | None = None,
+        observe: t.Callable[..., None] | None = None,
+    ) -> requests.Response:
+        """GET `url` with `headers` and wrap the raw body in a `requests.Response`.
+
+        The engine is shared by every stream, so each passes its own headers.
+        Each call is reported to `observe(url, response, started, cached=...)`
+        when given, with `started` taken from `time.perf_counter()`.
+        """
+        started = time.perf_counter()
+        if self._response_cache is not None:
+            cached = await self._loop.run_in_executor(
+                None, self._response_cache.get, url
+            )
+            if cached is not None:
+                if observe is not None:
+                    observe(url, cached, started, cached=True)
+                return cached
+
+        async with self._semaphore:
+            await self._rate_limiter.acquire_async()
+            started = time.perf_counter()
+            async with self._session.get(url, headers=headers) as resp:
+                body = await resp.read()
+
+        response = requests.Response()
+        response.status_code = resp.status
+        response.reason = resp.reason
+        response.url = str(resp.url)
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response._content = body
+        if observe is not None:
+            observe(url, response, started)
+        if self._response_cache is not None:
+            await self._loop.run_in_executor(
+                None, self._response_cache.put, url, response
+            )
+        return response
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Close the HTTP session and stop the event loop.
+
+        Requests already handed out are completed first, since their results
+        may still be waiting to be consumed.
+        """
+        if self._shutdown:
+            return
+        self._shutdown = True
+        if cancel_futures:
+            for future in list(self._futures):
+                future.cancel()
+        closed = asyncio.run_coroutine_threadsafe(self._close(), self._loop)
+        closed.add_done_callback(
+            lambda _: self._loop.call_soon_threadsafe(self._loop.stop)
+        )
+        closed.result()
+        if wait:
+            self._thread.join()
+
+    async def _close(self) -> None:
+        in_flight = [asyncio.wrap_future(future) for future in list(self._futures)]
+        await asyncio.gather(*in_flight, return_exceptions=True)
+        await self._session.close()
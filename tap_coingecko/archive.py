@@ -0,0 +1,283 @@
+"""Append-only archive of the responses each partition sync consumed, for replay."""
+
+from __future__ import annotations
+
+import gzip
+import itertools
+import json
+import os
+import threading
+import time
+import typing as t
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+from uuid import uuid4
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+COIN_LISTS_DIR = "_coin_lists"
+
+
+def json_response(url: str, payload: t.Any) -> requests.Response:
+    """Return a successful response for `url` carrying `payload` as its body."""
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = url
+    response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+def url_window(url: str, recorded_at: float) -> tuple[float | None, float] | None:
+    """Return the (start, end) epoch seconds of the data `url` asks for, if timed.
+
+    Range requests carry their window, `days` requests end when they were made
+    and `days=max` has no start.
+    """
+    params = dict(parse_qsl(urlsplit(url).query))
+    if "from" in params and "to" in params:
+        return float(params["from"]), float(params["to"])
+    days = params.get("days")
+    if days == "max":
+        return None, recorded_at
+    if days:
+        try:
+            return recorded_at - float(days) * 86400, recorded_at
+        except ValueError:
+            return None
+    return None
+
+
+def _context_key(context: dict | None) -> str:
+    return json.dumps(context, sort_keys=True)
+
+
+@dataclass
+class ArchivedSync:
+    """The responses of one partition sync, in the order it consumed them.
+
+    `calls` holds one list of responses per `fetch_urls` or `request_json`
+    call. Coin lists are looked up by url instead, since the streams read
+    them from a cache that is not hit at a fixed point of the sync.
+    """
+
+    context: dict | None
+    sync_id: str
+    calls: deque[list[requests.Response]] = field(default_factory=deque)
+    coin_lists: dict[str, requests.Response | None] = field(default_factory=dict)
+
+
+class ResponseArchive:
+    """Record the responses every partition sync consumed, and serve them back.
+
+    Each call is appended to `<archive_dir>/<stream>/<UTC date>.gz` as its own
+    gzip member, and indexed in `<archive_dir>/<stream>/index.jsonl` with the
+    coin, the sync it belongs to, its urls and the time window they cover. Coin
+    lists are stored once per run under `_coin_lists` and referenced from the
+    syncs that read them. Files are only ever appended to, in single writes,
+    so runs and shard processes can record into the same directory.
+    """
+
+    def __init__(
+        self, archive_dir: str | Path, clock: t.Callable[[], float] = time.time
+    ):
+        self.archive_dir = Path(archive_dir)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._run_id = uuid4().hex[:12]
+        self._syncs = itertools.count(1)
+        self._coin_list_refs: dict[str, dict] = {}
+        self._indexes: dict[str, list[dict]] = {}
+        self._coin_lists: dict[tuple[str, int], requests.Response] = {}
+
+    def new_sync(self, context: dict | None) -> ArchivedSync:
+        """Start recording a partition sync of `context`."""
+        return ArchivedSync(context, f"{self._run_id}-{next(self._syncs)}")
+
+    def _append(self, path: Path, data: bytes) -> int:
+        """Append `data` to `path` in a single write and return where it starts."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            return os.lseek(fd, 0, os.SEEK_CUR) - len(data)
+        finally:
+            os.close(fd)
+
+    def _write_responses(
+        self, directory: str, responses: list[requests.Response], now: float
+    ) -> dict:
+        header = {
+            "responses": [
+                {
+                    "url": response.url,
+                    "status": response.status_code,
+                    "headers": dict(response.headers),
+                    "size": len(response.content),
+                }
+                for response in responses
+            ]
+        }
+        data = gzip.compress(
+            json.dumps(header).encode()
+            + b"\n"
+            + b"".join(response.content for response in responses)
+        )
+        day = datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%d")
+        file = f"{directory}/{day}.gz"
+        offset = self._append(self.archive_dir / file, data)
+        return {"file": file, "offset": offset, "length": len(data)}
+
+    def _index(self, stream: str, sync: ArchivedSync, entry: dict) -> None:
+        context = sync.context or {}
+        line = {
+            "sync": sync.sync_id,
+            "coin": context.get("id"),
+            "context": sync.context,
+            **entry,
+        }
+        self._append(
+            self.archive_dir / stream / "index.jsonl",
+            (json.dumps(line) + "\n").encode(),
+        )
+
+    def record(
+        self, stream: str, sync: ArchivedSync, responses: list[requests.Response]
+    ) -> None:
+        """Append one call of `sync` and index it."""
+        now = self._clock()
+        urls = [response.url for response in responses]
+        windows = [w for w in (url_window(url, now) for url in urls) if w]
+        window = None
+        if windows:
+            starts = [start for start, _ in windows]
+            window = [
+                None if None in starts else min(starts),
+                max(end for _, end in windows),
+            ]
+        with self._lock:
+            ref = self._write_responses(stream, responses, now)
+            self._index(
+                stream,
+                sync,
+                {
+                    "kind": "call",
+                    "recorded_at": now,
+                    "urls": urls,
+                    "window": window,
+                    **ref,
+                },
+            )
+
+    def record_coin_list(
+        self, stream: str, sync: ArchivedSync, url: str, coins: list[dict]
+    ) -> None:
+        """Reference the coin list read from `url` in `sync`, storing it once per run."""
+        if url in sync.coin_lists:
+            return
+        now = self._clock()
+        with self._lock:
+            ref = self._coin_list_refs.get(url)
+            if ref is None:
+                ref = self._write_responses(
+                    COIN_LISTS_DIR, [json_response(url, coins)], now
+                )
+                self._coin_list_refs[url] = ref
+            self._index(
+                stream,
+                sync,
+                {
+                    "kind": "coin_list",
+                    "recorded_at": now,
+                    "urls": [url],
+                    "window": None,
+                    **ref,
+                },
+            )
+        sync.coin_lists[url] = None
+
+    def entries(
+        self,
+        stream: str,
+        coin: str | None = None,
+        start: float | None = None,
+        end: float | None = None,
+    ) -> list[dict]:
+        """Return the index entries of `stream` in recorded order.
+
+        Filtered to one `coin` and to the calls whose window overlaps
+        `start`..`end` epoch seconds, when given.
+        """
+        if stream not in self._indexes:
+            path = self.archive_dir / stream / "index.jsonl"
+            try:
+                with open(path) as f:
+                    # A crashed writer can leave a partial last line.
+                    lines = [line for line in f if line.endswith("\n")]
+            except FileNotFoundError:
+                lines = []
+            self._indexes[stream] = [json.loads(line) for line in lines]
+
+        entries = self._indexes[stream]
+        if coin is not None:
+            entries = [e for e in entries if e["coin"] == coin]
+        if start is not None or end is not None:
+            entries = [
+                e
+                for e in entries
+                if e["window"]
+                and (end is None or e["window"][0] is None or e["window"][0] <= end)
+                and (start is None or e["window"][1] >= start)
+            ]
+        return entries
+
+    def contexts(self, stream: str) -> list[dict | None]:
+        """Return the contexts `stream` recorded syncs for, in first recorded order."""
+        contexts = {}
+        for entry in self.entries(stream):
+            contexts.setdefault(_context_key(entry["context"]), entry["context"])
+        return list(contexts.values())
+
+    def read(self, entry: dict) -> list[requests.Response]:
+        """Return the responses of an index entry."""
+        with open(self.archive_dir / entry["file"], "rb") as f:
+            f.seek(entry["offset"])
+            data = gzip.decompress(f.read(entry["length"]))
+        header, _, body = data.partition(b"\n")
+        responses = []
+        offset = 0
+        for meta in json.loads(header)["responses"]:
+            response = requests.Response()
+            response.status_code = meta["status"]
+            response.reason = "OK"
+            response.url = meta["url"]
+            response.headers = CaseInsensitiveDict(meta["headers"])
+            response._content = body[offset : offset + meta["size"]]
+            offset += meta["size"]
+            responses.append(response)
+        return responses
+
+    def replay(self, stream: str, context: dict | None) -> t.Iterator[ArchivedSync]:
+        """Yield the recorded syncs of `context`, oldest first, read one at a time."""
+        key = _context_key(context)
+        syncs: dict[str, list[dict]] = {}
+        for entry in self.entries(stream):
+            if _context_key(entry["context"]) == key:
+                syncs.setdefault(entry["sync"], []).append(entry)
+
+        for sync_id, entries in syncs.items():
+            sync = ArchivedSync(context, sync_id)
+            for entry in entries:
+                if entry["kind"] == "coin_list":
+                    ref = (entry["file"], entry["offset"])
+                    if ref not in self._coin_lists:
+                        [self._coin_lists[ref]] = self.read(entry)
+                    sync.coin_lists[entry["urls"][0]] = self._coin_lists[ref]
+                else:
+                    sync.calls.append(self.read(entry))
+            yield sync
@@ -0,0 +1,33 @@
+"""Backfill planning for the `/coins/{id}/market_chart/range` endpoint."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+# Widest date range one /market_chart/range request may span per interval
+# (enterprise plans). Intervals that are missing have no limit.
+MAX_RANGE_DAYS = {
+    "5m": 10,
+    "hourly": 100,
+}
+
+
+def plan_windows(
+    start: datetime, end: datetime, interval: str | None
+) -> list[tuple[datetime, datetime]]:
+    """Split `[start, end]` into consecutive windows that fit the range limit.
+
+    Consecutive windows share their boundary, so the point at a boundary may
+    come back twice and has to be dropped by the caller when stitching.
+    """
+    max_days = MAX_RANGE_DAYS.get(interval)
+    if max_days is None:
+        return [(start, end)]
+
+    max_span = timedelta(days=max_days)
+    windows = []
+    while start < end:
+        window_end = min(start + max_span, end)
+        windows.append((start, window_end))
+        start = window_end
+    return windows
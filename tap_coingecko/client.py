@@ -3,13 +3,30 @@
 from __future__ import annotations
 
 import sys
-from typing import Any, Callable, Iterable
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import cached_property, partial
+from typing import Any, Callable, Generator, Iterable, Iterator
+from urllib.parse import urlencode
 import requests
+from dateutil.parser import parse
 from singer_sdk.authenticators import APIKeyAuthenticator
+from singer_sdk.exceptions import InvalidStreamSortException, RetriableAPIError
+from singer_sdk.helpers._batch import BaseBatchFileEncoding, BatchConfig
 from singer_sdk.pagination import BaseAPIPaginator  # noqa: TCH002
 from singer_sdk.streams import RESTStream
+from singer_sdk.streams.core import REPLICATION_INCREMENTAL
 import importlib.resources as importlib_resources
 
+from tap_coingecko.archive import ArchivedSync
+from tap_coingecko.emit import RecordWriter
+from tap_coingecko.freshness import CADENCES, next_data_at
+from tap_coingecko.instrumentation import RunMetrics
+from tap_coingecko.prefetch import PartitionPrefetcher
+from tap_coingecko.rate_limit import TokenBucket
+from tap_coingecko.sharding import shard_of
+
 _Auth = Callable[[requests.PreparedRequest], requests.PreparedRequest]
 
 
@@ -38,6 +55,21 @@ class CoingeckoStream(RESTStream):
 
     records_jsonpath = "$[*]"
 
+    # Seconds the current partition spent waiting on responses.
+    _fetch_seconds = 0.0
+
+    # Snapshot streams that `poll_interval` keeps re-syncing.
+    pollable = False
+
+    # Whether records always match the schema, so `fast_emit` can write them.
+    trusted_schema = False
+
+    # Query flag that turns off each top-level property, for deselected ones.
+    property_query_flags: dict[str, str] = {}
+
+    # The partition sync being recorded to or replayed from the response archive.
+    _archive_sync: ArchivedSync | None = None
+
     # Set this value or override `get_new_paginator`
     next_page_token_jsonpath = "$.next_page"
 
@@ -49,9 +81,433 @@ class CoingeckoStream(RESTStream):
             An authenticator instance.
         """
         return APIKeyAuthenticator.create_for_stream(
-            self, key="api-key", value=self.config.get("api_key"), location="header"
+            self,
+            key="x-cg-pro-api-key",
+            value=self.config.get("api_key"),
+            location="header",
+        )
+
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the keep-alive session shared by every stream of the tap."""
+        return self._tap.requests_session
+
+    @property
+    def coin_list_url(self) -> str:
+        """Return the `/coins/list` url shared by every consumer of the coin list."""
+        stream_params = (self.config.get("stream_params") or {}).get("coin_list")
+        url = f"{self.url_base}/coins/list"
+        return f"{url}?{urlencode(stream_params)}" if stream_params else url
+
+    def get_coin_list(self) -> list[dict]:
+        """Return the coin list from the tap-wide cache, downloading it on a miss."""
+        url = self.coin_list_url
+        if self.replaying:
+            sync = self._archive_sync
+            response = sync.coin_lists.get(url) if sync is not None else None
+            assert response is not None, f"No coin list for {url} in the archive"
+            return response.json()
+
+        started = time.perf_counter()
+        coins = self._tap.coin_list_cache.get(url, lambda: self.request_url(url).json())
+        self._fetch_seconds += time.perf_counter() - started
+        if self._archive_sync is not None:
+            self._tap.response_archive.record_coin_list(
+                self.name, self._archive_sync, url, coins
+            )
+        return coins
+
+    def in_shard(self, coin_id: str) -> bool:
+        """Whether this process syncs `coin_id`, given `shard_index` and `shard_count`."""
+        shard_count = self.config.get("shard_count", 1)
+        if shard_count <= 1:
+            return True
+        shard_index = self.config.get("shard_index", 0)
+        assert (
+            0 <= shard_index < shard_count
+        ), f"shard_index must be between 0 and {shard_count - 1}, got {shard_index}"
+        return shard_of(coin_id, shard_count) == shard_index
+
+    @property
+    def rate_limiter(self) -> TokenBucket:
+        """Return the token bucket shared by every stream of the tap."""
+        return self._tap.rate_limiter
+
+    @property
+    def run_metrics(self) -> RunMetrics | None:
+        """Return the timing collector shared by every stream, if enabled."""
+        return self._tap.run_metrics
+
+    @cached_property
+    def deselected_properties(self) -> frozenset[str]:
+        """Return the top-level properties the catalog deselects."""
+        return frozenset(
+            name
+            for name in self.schema["properties"]
+            if not self.mask[("properties", name)]
+        )
+
+    def selection_query_flags(self) -> dict[str, str]:
+        """Return the query flags that keep deselected properties out of responses."""
+        return {
+            flag: "false"
+            for name, flag in self.property_query_flags.items()
+            if name in self.deselected_properties
+        }
+
+    def drop_deselected(self, record: dict) -> dict:
+        """Remove deselected top-level properties before the SDK walks the record."""
+        for name in self.deselected_properties:
+            record.pop(name, None)
+        return record
+
+    @property
+    def vectorized_decode(self) -> bool:
+        """Whether time-series arrays are decoded with NumPy."""
+        return self.config.get("vectorized_decode", False)
+
+    @property
+    def replaying(self) -> bool:
+        """Whether responses come from the response archive instead of the API."""
+        return self.config.get("archive_mode") == "replay"
+
+    @contextmanager
+    def recording(self, context: dict | None) -> Iterator[None]:
+        """Record the responses consumed inside the block as one sync of `context`."""
+        if self.config.get("archive_mode") != "record":
+            yield
+            return
+        self._archive_sync = self._tap.response_archive.new_sync(context)
+        try:
+            yield
+        finally:
+            self._archive_sync = None
+
+    def archive_call(self, responses: list[requests.Response]) -> None:
+        """Append the responses of one call to the archive, when recording."""
+        if self._archive_sync is not None and not self.replaying:
+            self._tap.response_archive.record(self.name, self._archive_sync, responses)
+
+    def replayed_call(self) -> list[requests.Response]:
+        """Return the responses of the next call of the replayed sync."""
+        assert self._archive_sync is not None and self._archive_sync.calls, (
+            f"{self.name} made more calls than archived for "
+            f"{self._archive_sync.context if self._archive_sync else None}"
+        )
+        return self._archive_sync.calls.popleft()
+
+    def validate_response(self, response: requests.Response) -> None:
+        """Feed throttling headers to the rate limiter before the usual checks."""
+        self.rate_limiter.observe(response.status_code, response.headers)
+        super().validate_response(response)
+
+    def backoff_wait_generator(self) -> Generator[float, None, None]:
+        """Retry 429s as soon as the rate limiter allows, other errors exponentially."""
+        exception = yield
+        tries = 0
+        while True:
+            response = getattr(exception, "response", None)
+            if response is not None and response.status_code == 429:
+                # The rate limiter is already paused for the Retry-After period.
+                exception = yield 0
+            else:
+                exception = yield 2 * 2**tries
+                tries += 1
+
+    def _request(
+        self, prepared_request: requests.PreparedRequest, context: dict | None
+    ) -> requests.Response:
+        self.rate_limiter.acquire()
+        return super()._request(prepared_request, context)
+
+    def build_prepared_request(self, *args, **kwargs) -> requests.PreparedRequest:
+        """Build an authenticated request without mutating the shared session."""
+        request = requests.Request(*args, auth=self.authenticator, **kwargs)
+        return self.requests_session.prepare_request(request)
+
+    def request_url(self, url: str, context: dict | None = None) -> requests.Response:
+        """GET a url through the shared session with the SDK retry handling.
+
+        Served from the response cache instead when it holds a current copy.
+        """
+        started = time.perf_counter()
+        response_cache = self._tap.response_cache
+        if response_cache is not None:
+            response = response_cache.get(url)
+            if response is not None:
+                self.observe_request(url, response, started, cached=True)
+                return response
+
+        attempts = 0
+
+        def _request(prepared_request, context):
+            nonlocal attempts
+            attempts += 1
+            return self._request(prepared_request, context)
+
+        prepared_request = self.build_prepared_request(
+            method="GET", url=url, headers=self.http_headers
+        )
+        response = self.request_decorator(_request)(prepared_request, context)
+        self.observe_request(url, response, started, retries=attempts - 1)
+        if response_cache is not None:
+            response_cache.put(url, response)
+        return response
+
+    def observe_request(
+        self,
+        url: str,
+        response: requests.Response,
+        started: float,
+        retries: int = 0,
+        cached: bool = False,
+    ) -> None:
+        """Report an HTTP call that began at `started` to the timing collector."""
+        if self.run_metrics is not None:
+            self.run_metrics.observe_request(
+                self.name,
+                url,
+                response,
+                time.perf_counter() - started,
+                retries=retries,
+                cached=cached,
+            )
+
+    def request_json(self, url: str, context: dict | None = None) -> Any:
+        """GET a url through the shared session and return the decoded body."""
+        if self.replaying:
+            [response] = self.replayed_call()
+            return response.json()
+
+        started = time.perf_counter()
+        response = self.request_url(url, context)
+        self.archive_call([response])
+        result = response.json()
+        self._fetch_seconds += time.perf_counter() - started
+        return result
+
+    @contextmanager
+    def timing_stream(self) -> Iterator[None]:
+        """Report the time spent inside the block as the stream sync duration."""
+        if self.run_metrics is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.run_metrics.observe_stream(self.name, time.perf_counter() - started)
+
+    def _sync_records(
+        self, context: dict | None = None, *, write_messages: bool = True
+    ) -> Generator[dict, Any, Any]:
+        """Sync the records of every partition, timing the stream."""
+        with self.timing_stream():
+            yield from super()._sync_records(context, write_messages=write_messages)
+
+    def _sync_batches(
+        self, batch_config: BatchConfig, context: dict | None = None
+    ) -> None:
+        """Sync the batches of every partition, timing the stream."""
+        with self.timing_stream():
+            super()._sync_batches(batch_config, context)
+
+    def get_records(self, context: dict | None) -> Iterable[dict]:
+        """Yield the partition records, timing fetch, decode and emit separately.
+
+        Time spent inside the record generator is fetch and decode, split by
+        the time `request_json` and `fetch_urls` waited on responses. Time
+        spent between records is the SDK validating and writing them.
+        """
+        if self.run_metrics is None:
+            yield from self.get_archived_records(context)
+            return
+
+        self._fetch_seconds = 0.0
+        records = iter(self.get_archived_records(context))
+        count = 0
+        extract_seconds = emit_seconds = 0.0
+        while True:
+            started = time.perf_counter()
+            record = next(records, None)
+            extract_seconds += time.perf_counter() - started
+            if record is None:
+                break
+            started = time.perf_counter()
+            yield record
+            emit_seconds += time.perf_counter() - started
+            count += 1
+
+        self.run_metrics.observe_partition(
+            self.name,
+            context,
+            count,
+            fetch_seconds=self._fetch_seconds,
+            decode_seconds=max(extract_seconds - self._fetch_seconds, 0.0),
+            emit_seconds=emit_seconds,
         )
 
+    def get_archived_records(self, context: dict | None) -> Iterable[dict]:
+        """Yield the partition records, recording or replaying them per `archive_mode`.
+
+        Replay runs `request_records` once per recorded sync of the partition,
+        oldest first, each resuming from the bookmark the previous one left.
+        """
+        if not self.replaying:
+            with self.recording(context):
+                yield from super().get_records(context)
+            return
+
+        for sync in self._tap.response_archive.replay(self.name, context):
+            self._archive_sync = sync
+            self._write_starting_replication_value(context)
+            yield from super().get_records(context)
+        self._archive_sync = None
+
+    @cached_property
+    def record_writer(self) -> RecordWriter | None:
+        """Return the fast RECORD writer, for trusted-schema streams with `fast_emit`."""
+        if not self.trusted_schema or not self.config.get("fast_emit", False):
+            return None
+        if self.config.get("stream_maps") or self.config.get("flattening_enabled"):
+            return None
+        return RecordWriter(self.name, self.deselected_properties)
+
+    def _write_record_message(self, record: dict) -> None:
+        """Write a RECORD message, through `record_writer` when there is one."""
+        if self.record_writer is None or not self.record_writer.write(record):
+            super()._write_record_message(record)
+            return
+        self._is_state_flushed = False
+
+    def _increment_stream_state(
+        self, latest_record: dict, *, context: dict | None = None
+    ) -> None:
+        """Advance the bookmark of a sorted incremental `record_writer` stream directly.
+
+        Sets the same value the SDK would, without converting each naive UTC
+        timestamp through pendulum. Other values take the SDK path.
+        """
+        value = latest_record.get(self.replication_key)
+        if (
+            self.record_writer is None
+            or self.replication_method != REPLICATION_INCREMENTAL
+            or not self.is_sorted
+            or not isinstance(value, datetime)
+            or value.tzinfo is not None
+        ):
+            super()._increment_stream_state(latest_record, context=context)
+            return
+
+        state = self.get_context_state(context)
+        new_value = value.isoformat() + "+00:00"
+        old_value = state.get("replication_key_value")
+        if old_value is not None and self.check_sorted and new_value < old_value:
+            raise InvalidStreamSortException(
+                f"Unsorted data detected in stream. Latest value '{new_value}' is "
+                f"smaller than previous max '{old_value}'."
+            )
+        state["replication_key"] = self.replication_key
+        state["replication_key_value"] = new_value
+
+    def decode_record(
+        self, response: requests.Response, stringify: Iterable[str] = ()
+    ) -> dict:
+        """Decode a single-object response into a record.
+
+        Top-level arrays named in `stringify` are stored as their `str()`, and
+        deselected properties are dropped. With `streaming_decode` the body is
+        parsed incrementally, so those arrays are never held as a full parsed
+        tree next to their string form, and dropped properties are never built.
+        """
+        if self.config.get("streaming_decode", False):
+            from tap_coingecko.json_stream import stream_record
+
+            return stream_record(
+                response.content, frozenset(stringify), self.deselected_properties
+            )
+
+        record = self.drop_deselected(response.json())
+        for key in stringify:
+            if key in record:
+                record[key] = str(record[key])
+        return record
+
+    def new_prefetcher(
+        self, contexts: Iterable[dict], prepare: Callable[[dict], list[str]]
+    ) -> PartitionPrefetcher | None:
+        """Return a prefetcher on the tap's `request_executor`, if there is one.
+
+        `prepare` turns each context into the urls to request and runs on the
+        calling thread. Replays never prefetch.
+        """
+        if self.replaying:
+            return None
+
+        executor = self._tap.request_executor
+        if executor is None:
+            return None
+
+        if self.config.get("request_engine") == "asyncio":
+            return PartitionPrefetcher(
+                contexts,
+                prepare=prepare,
+                fetch=partial(
+                    executor.get,
+                    headers={**self.http_headers, **self.authenticator.auth_headers},
+                    observe=self.observe_request,
+                ),
+                executor=executor,
+                window=self.config.get("max_concurrency", 100),
+            )
+
+        return PartitionPrefetcher(
+            contexts,
+            prepare=prepare,
+            fetch=self.request_url,
+            executor=executor,
+            window=self.config.get("max_workers", 1) * 2,
+        )
+
+    def fetch_urls(
+        self,
+        prefetcher: PartitionPrefetcher | None,
+        context: dict,
+        prepare: Callable[[dict], list[str]],
+    ) -> list[requests.Response]:
+        """Return the responses for the urls of `context`, in request order.
+
+        Responses come from `prefetcher` when it has them lined up. Otherwise,
+        and for prefetched requests that hit a retriable error or whose
+        connection failed in the asyncio engine, they are requested here with
+        the usual SDK retry handling. Replays return the next archived call
+        instead.
+        """
+        if self.replaying:
+            return self.replayed_call()
+
+        started = time.perf_counter()
+        futures = prefetcher.take(context) if prefetcher is not None else None
+        if futures is None:
+            responses = [self.request_url(url, context) for url in prepare(context)]
+        else:
+            from tap_coingecko.aio import TRANSPORT_ERRORS
+
+            responses = []
+            for url, future in futures:
+                try:
+                    response = future.result()
+                    self.validate_response(response)
+                except (RetriableAPIError, *TRANSPORT_ERRORS) as e:
+                    self.logger.warning(
+                        f"Retrying {context} after prefetch error: {e!r}"
+                    )
+                    response = self.request_url(url, context)
+                responses.append(response)
+        self._fetch_seconds += time.perf_counter() - started
+        self.archive_call(responses)
+        return responses
+
 
 class DynamicIDCoingeckoStream(CoingeckoStream):
     def __init__(
@@ -63,41 +519,213 @@ class DynamicIDCoingeckoStream(CoingeckoStream):
     ):
         super().__init__(tap, name, schema, path)
         self.ticker = None
-        self.stream_params = self.config.get("stream_params").get(self.name)
+        self._prefetcher = None
+        self._current_partitions: dict[str, bool] = {}
 
-        assert ("id" not in self.stream_params.keys()) or (
-            "ids" not in self.stream_params.keys()
+    @cached_property
+    def stream_params(self) -> dict:
+        """Return the stream settings, validated on first use rather than at discovery."""
+        stream_params = self.config.get("stream_params").get(self.name)
+
+        assert ("id" not in stream_params.keys()) or (
+            "ids" not in stream_params.keys()
         ), f"Both 'id' and 'ids' cannot be present in meltano.yml stream params for {self.name}"
+        return stream_params
 
-        self.multi_tickers = False
-        if "ids" in self.stream_params.keys():
-            self.multi_tickers = True
+    @property
+    def multi_tickers(self) -> bool:
+        return "ids" in self.stream_params.keys()
 
-        self.dynamic_ticker_stream = False
-        if "ids" in self.stream_params and self.stream_params["ids"] == "*":
-            self.dynamic_ticker_stream = True
+    @property
+    def dynamic_ticker_stream(self) -> bool:
+        return self.stream_params.get("ids") == "*"
 
-        if self.dynamic_ticker_stream:
-            coin_list_endpoint = "https://pro-api.coingecko.com/api/v3/coins/list"
-            response = requests.get(
-                coin_list_endpoint,
-                headers={"x-cg-pro-api-key": self.config.get("api_key")},
-            )
-            self.all_tickers = response.json()
+    @property
+    def all_tickers(self) -> list[dict]:
+        return self.get_coin_list()
 
     @property
     def partitions(self):
+        if self.replaying:
+            return [
+                context
+                for context in self._tap.response_archive.contexts(self.name)
+                if context and self.in_shard(context["id"])
+            ]
         if self.multi_tickers:
             if self.stream_params["ids"] != "*":
-                return [
-                    {"id": ticker}
-                    for ticker in [
-                        i.strip() for i in self.stream_params["ids"].split(",")
-                    ]
-                ]
+                ids = [i.strip() for i in self.stream_params["ids"].split(",")]
             elif self.stream_params["ids"] == "*":
-                return [{"id": t["id"]} for t in self.all_tickers]
+                ids = [t["id"] for t in self.all_tickers]
             else:
                 raise ValueError("Could not set a proper partition.")
         else:
-            return [{"id": self.stream_params.get("id")}]
+            ids = [self.stream_params.get("id")]
+        return [{"id": ticker} for ticker in ids if self.in_shard(ticker)]
+
+    @property
+    def data_interval(self) -> str | None:
+        """Interval of the points a partition serves, for freshness checks."""
+        return None
+
+    def partition_is_current(self, context: dict) -> bool:
+        """Whether the partition bookmark rules out any newer point existing yet.
+
+        Only checked with `skip_current_partitions`. The answer is kept for the
+        rest of the run, so prefetching and syncing agree on it.
+        """
+        if self.replaying or not self.config.get("skip_current_partitions", False):
+            return False
+        if self.data_interval not in CADENCES:
+            return False
+
+        if context["id"] not in self._current_partitions:
+            bookmark = self.get_context_state(context).get("replication_key_value")
+            self._current_partitions[context["id"]] = bookmark is not None and (
+                datetime.now(timezone.utc)
+                < next_data_at(parse(bookmark), self.data_interval)
+            )
+        return self._current_partitions[context["id"]]
+
+    def get_records(self, context: dict | None) -> Iterable[dict]:
+        if context is not None and self.partition_is_current(context):
+            self.logger.debug(f"Skipping {context}, it cannot have new data yet.")
+            return
+        yield from super().get_records(context)
+
+    # Whether BATCH files are written straight from `partition_columns`.
+    columnar_batches = False
+
+    def partition_columns(self, context: dict) -> dict[str, list]:
+        """Return the new points of a partition as columns, `timestamp` in epoch ms."""
+        raise TypeError(
+            f"{self.name} sets columnar_batches but does not define partition_columns"
+        )
+
+    def get_batches(
+        self, batch_config: BatchConfig, context: dict | None = None
+    ) -> Iterable[tuple[BaseBatchFileEncoding, list[str]]]:
+        """Write batch files from decoded columns when the stream supports it.
+
+        Each partition is written in files of up to `batch_size` rows, and the
+        partition bookmark advances to the last point of each file.
+        """
+        if not self.columnar_batches or self.replaying:
+            yield from super().get_batches(batch_config, context)
+            return
+
+        from tap_coingecko.batch import ColumnBatchWriter, chunk_columns
+
+        writer = ColumnBatchWriter(
+            batch_config, self.tap_name, self.name, self.deselected_properties
+        )
+        for partition in [context] if context else self.partitions:
+            # The starting bookmark is what `partition_columns` reads its cutoff from.
+            self._write_starting_replication_value(partition)
+            if self.partition_is_current(partition):
+                continue
+            with self.recording(partition):
+                columns = self.partition_columns(partition)
+            for chunk in chunk_columns(columns, batch_config.batch_size):
+                manifest = writer.write(chunk)
+                last_point = datetime.utcfromtimestamp(chunk["timestamp"][-1] / 1000)
+                self._increment_stream_state(
+                    {self.replication_key: last_point}, context=partition
+                )
+                yield batch_config.encoding, manifest
+
+    def fetch_partition_responses(self, context: dict) -> list[requests.Response]:
+        """Return the responses for every url of a partition.
+
+        With `max_workers` > 1 or `request_engine: asyncio` the upcoming
+        partitions are requested ahead of time, while records and state are
+        still emitted from the calling thread one partition after another.
+        """
+        if self._prefetcher is None or self._prefetcher.finished:
+            partitions = self.partitions
+            self._prefetcher = (
+                self.new_prefetcher(
+                    partitions[partitions.index(context) :],
+                    prepare=self.prepare_partition_urls,
+                )
+                if context in partitions
+                else None
+            )
+
+        return self.fetch_urls(self._prefetcher, context, self.prepare_partition_urls)
+
+    def fetch_partition(self, context: dict) -> requests.Response:
+        """Return the response for a partition served by a single request."""
+        return self.fetch_partition_responses(context)[0]
+
+    def get_partition_urls(self, context: dict) -> list[str]:
+        """Return the urls that make up a partition, in the order to emit them."""
+        return [self.get_url(context)]
+
+    def prepare_partition_urls(self, context: dict) -> list[str]:
+        """Seed the partition bookmark and build its urls ahead of its sync turn."""
+        self._write_starting_replication_value(context)
+        if self.partition_is_current(context):
+            return []
+        return self.get_partition_urls(context)
+
+
+class BatchedIdsCoingeckoStream(CoingeckoStream):
+    """Resolve many coin ids per request through a comma separated `ids` param.
+
+    Takes the same `ids` setting as the id based streams, including `"*"`, and
+    packs as many ids into each request as the endpoint allows. The batches are
+    fetched through the configured request engine and fanned back out to
+    per-coin records by `parse_batch`.
+    """
+
+    max_ids_per_request = 250
+    # Keeps request urls well below common 8 KB server limits.
+    max_ids_length = 6000
+
+    @property
+    def stream_params(self) -> dict:
+        return self.config.get("stream_params").get(self.name)
+
+    def get_ids(self) -> list[str]:
+        ids = self.stream_params["ids"]
+        if ids == "*":
+            ids = [coin["id"] for coin in self.get_coin_list()]
+        else:
+            ids = [i.strip() for i in ids.split(",")]
+        return [coin_id for coin_id in ids if self.in_shard(coin_id)]
+
+    def get_id_batches(self) -> list[list[str]]:
+        batches: list[list[str]] = []
+        length = 0
+        for coin_id in self.get_ids():
+            if (
+                not batches
+                or len(batches[-1]) >= self.max_ids_per_request
+                or length + len(coin_id) + 1 > self.max_ids_length
+            ):
+                batches.append([])
+                length = 0
+            batches[-1].append(coin_id)
+            length += len(coin_id) + 1
+        return batches
+
+    def get_batch_url(self, batch_context: dict) -> str:
+        url_params = self.stream_params.copy()
+        url_params["ids"] = batch_context["ids"]
+        return f"{self.endpoint}?{urlencode(url_params)}"
+
+    def parse_batch(self, result: Any) -> Iterable[dict]:
+        yield from result
+
+    def request_records(self, context: dict | None) -> Iterable[dict]:
+        batches = [{"ids": ",".join(batch)} for batch in self.get_id_batches()]
+        prepare = lambda batch_context: [self.get_batch_url(batch_context)]
+        prefetcher = self.new_prefetcher(batches, prepare=prepare)
+
+        for batch_context in batches:
+            for response in self.fetch_urls(prefetcher, batch_context, prepare):
+                yield from self.parse_batch(response.json())
+
+        if prefetcher is not None:
+            prefetcher.close()
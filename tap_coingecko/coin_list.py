@@ -0,0 +1,68 @@
+"""Process-wide, disk-backed cache of the CoinGecko coin list."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "tap-coingecko"
+
+
+class CoinListCache:
+    """Download `/coins/list` at most once per process and once per TTL on disk.
+
+    `CoinListStream` and every `ids: "*"` stream read the list from here, so a
+    run pays for a single multi-MB download no matter how many streams need it,
+    and back-to-back runs within `ttl` seconds pay for none. Entries are keyed
+    by url, so a different `api_url` or `coin_list` stream params never share
+    a file.
+    """
+
+    def __init__(self, cache_dir: str | Path | None, ttl: float):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.ttl = ttl
+        self._coins: dict[str, list[dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, fetch: t.Callable[[], list[dict]]) -> list[dict]:
+        """Return the coin list for `url`, calling `fetch` only on a cache miss."""
+        with self._lock:
+            if url not in self._coins:
+                coins = self._load(url)
+                if coins is None:
+                    coins = fetch()
+                    self._store(url, coins)
+                self._coins[url] = coins
+            return self._coins[url]
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode()).hexdigest()[:16]
+        return self.cache_dir / f"coins_list_{digest}.json"
+
+    def _load(self, url: str) -> list[dict] | None:
+        path = self._path(url)
+        if not self.ttl or not path.exists():
+            return None
+        if time.time() - path.stat().st_mtime > self.ttl:
+            return None
+        try:
+            with path.open() as f:
+                return json.load(f)
+        except ValueError:
+            return None
+
+    def _store(self, url: str, coins: list[dict]) -> None:
+        if not self.ttl:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(url)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w") as f:
+            json.dump(coins, f)
+        os.replace(tmp_path, path)
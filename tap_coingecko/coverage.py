@@ -0,0 +1,64 @@
+"""Per-coin index of the time ranges a time-series stream has already synced.
+
+Ranges are `[start, end]` pairs of epoch seconds, kept sorted and merged so the
+index stays a handful of numbers per coin in state.
+"""
+
+from __future__ import annotations
+
+import bisect
+import typing as t
+
+Range = t.Tuple[int, int]
+
+
+def add_range(covered: list[list[int]], start: int, end: int) -> list[list[int]]:
+    """Return `covered` with `[start, end]` added, merging overlapping ranges."""
+    merged: list[list[int]] = []
+    for range_start, range_end in sorted([*covered, [start, end]]):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], range_end)
+        else:
+            merged.append([range_start, range_end])
+    return merged
+
+
+def find_gaps(covered: list[list[int]], start: int, end: int) -> list[Range]:
+    """Return the parts of `[start, end]` that `covered` does not include."""
+    gaps = []
+    for range_start, range_end in covered:
+        if range_end <= start:
+            continue
+        if range_start >= end:
+            break
+        if range_start > start:
+            gaps.append((start, range_start))
+        start = max(start, range_end)
+    if start < end:
+        gaps.append((start, end))
+    return gaps
+
+
+def plan_requests(gaps: list[Range], max_span: int | None) -> list[Range]:
+    """Cover `gaps` with as few range requests of at most `max_span` seconds.
+
+    Neighbouring gaps share a request whenever it still fits in `max_span`,
+    refetching the covered stretch between them. Gaps wider than `max_span`
+    are split.
+    """
+    requests: list[Range] = []
+    for gap_start, gap_end in gaps:
+        if requests and (max_span is None or gap_end - requests[-1][0] <= max_span):
+            requests[-1] = (requests[-1][0], gap_end)
+            continue
+        while max_span is not None and gap_end - gap_start > max_span:
+            requests.append((gap_start, gap_start + max_span))
+            gap_start += max_span
+        requests.append((gap_start, gap_end))
+    return requests
+
+
+def in_gaps(gaps: list[Range], timestamp: float) -> bool:
+    """Whether `timestamp` falls inside one of the sorted `gaps`."""
+    index = bisect.bisect_right(gaps, (timestamp, float("inf"))) - 1
+    return index >= 0 and gaps[index][0] <= timestamp <= gaps[index][1]
@@ -0,0 +1,189 @@
+"""Decoding of CoinGecko `[epoch ms, value, ...]` time-series arrays into records.
+
+The OHLC and circulating supply decoders have a plain Python path and an
+optional NumPy path, selected with the `vectorized_decode` setting. The NumPy
+path reads the epoch milliseconds into an int64 array and converts them to
+timestamps in bulk. Values are left as the JSON parser built them, since a
+record holds Python objects either way. `/market_chart` has no NumPy path:
+taking the earliest timestamp of its three series in NumPy costs about as much
+as it saves. Both paths emit the same records and build them lazily, as they
+are consumed. The `*_columns` decoders
+skip records altogether and return the points as columns, for writing batch
+files.
+
+CoinGecko returns the points in time order, so the bookmark cutoff is found by
+bisecting the raw arrays and records are only built for the newer tail.
+"""
+
+from __future__ import annotations
+
+import bisect
+import typing as t
+from datetime import datetime, timezone
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised without the extra installed
+    np = None
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "vectorized_decode requires numpy. "
+            "Install it with `pip install tap-coingecko[vectorized]`."
+        )
+
+
+def to_epoch_ms(value: datetime | None) -> int | None:
+    """Return epoch milliseconds for `value`, reading naive datetimes as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+class _PointTimes:
+    """Sequence of the earliest epoch ms of the aligned points of `series`."""
+
+    def __init__(self, *series: t.Sequence[t.Sequence]):
+        self._series = series
+        self._length = min(len(points) for points in series)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> float:
+        return min(points[index][0] for points in self._series)
+
+
+def cutoff_index(since_ms: int | None, *series: t.Sequence[t.Sequence]) -> int:
+    """Return the index of the first point at or after `since_ms` in `series`."""
+    if since_ms is None:
+        return 0
+    return bisect.bisect_left(_PointTimes(*series), since_ms)
+
+
+def _epoch_ms(points: t.Sequence[t.Sequence]) -> np.ndarray:
+    return np.array([point[0] for point in points], dtype=np.int64)
+
+
+def _timestamps(epoch_ms: np.ndarray) -> list[datetime]:
+    return epoch_ms.astype("datetime64[ms]").tolist()
+
+
+def market_chart_records(
+    result: dict,
+    coin_id: str,
+    since_ms: int | None = None,
+) -> t.Iterator[dict]:
+    """Yield one record per `/market_chart` point at or after `since_ms`."""
+    series = (result["prices"], result["market_caps"], result["total_volumes"])
+    start = cutoff_index(since_ms, *series)
+    prices, market_caps, volumes = (points[start:] for points in series)
+
+    for price, market_cap, volume in zip(prices, market_caps, volumes):
+        point_ms = min(price[0], market_cap[0], volume[0])
+        yield {
+            "timestamp": datetime.utcfromtimestamp(point_ms / 1000),
+            "id": coin_id,
+            "price": price[1],
+            "market_cap": market_cap[1],
+            "volume": volume[1],
+        }
+
+
+def market_chart_columns(result: dict, since_ms: int | None = None) -> dict:
+    """Return the `/market_chart` points at or after `since_ms` as columns.
+
+    `timestamp` holds epoch milliseconds.
+    """
+    series = (result["prices"], result["market_caps"], result["total_volumes"])
+    start = cutoff_index(since_ms, *series)
+    prices, market_caps, volumes = (points[start:] for points in series)
+    n = min(len(prices), len(market_caps), len(volumes))
+    prices, market_caps, volumes = prices[:n], market_caps[:n], volumes[:n]
+    return {
+        "timestamp": [
+            min(price[0], market_cap[0], volume[0])
+            for price, market_cap, volume in zip(prices, market_caps, volumes)
+        ],
+        "price": [price[1] for price in prices],
+        "market_cap": [market_cap[1] for market_cap in market_caps],
+        "volume": [volume[1] for volume in volumes],
+    }
+
+
+def ohlc_records(
+    result: list,
+    coin_id: str,
+    since_ms: int | None = None,
+    vectorized: bool = False,
+) -> t.Iterator[dict]:
+    """Yield one record per `/ohlc` candle at or after `since_ms`."""
+    result = result[cutoff_index(since_ms, result) :]
+    if vectorized:
+        require_numpy()
+        yield from (
+            {
+                "timestamp": timestamp,
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "id": coin_id,
+            }
+            for timestamp, (_, open_, high, low, close) in zip(
+                _timestamps(_epoch_ms(result)), result
+            )
+        )
+        return
+
+    for point_ms, open_, high, low, close in result:
+        yield {
+            "timestamp": datetime.utcfromtimestamp(point_ms / 1000),
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "id": coin_id,
+        }
+
+
+def ohlc_columns(result: list, since_ms: int | None = None) -> dict:
+    """Return the `/ohlc` candles at or after `since_ms` as columns.
+
+    `timestamp` holds epoch milliseconds.
+    """
+    candles = result[cutoff_index(since_ms, result) :]
+    columns = list(zip(*candles)) or [()] * 5
+    return {
+        name: list(values)
+        for name, values in zip(("timestamp", "open", "high", "low", "close"), columns)
+    }
+
+
+def circulating_supply_records(
+    result: dict,
+    coin_id: str,
+    since_ms: int | None = None,
+    vectorized: bool = False,
+) -> t.Iterator[dict]:
+    """Yield one record per `/circulating_supply_chart` point at or after `since_ms`."""
+    points = result["circulating_supply"]
+    points = points[cutoff_index(since_ms, points) :]
+    if vectorized:
+        require_numpy()
+        yield from (
+            {"id": coin_id, "timestamp": timestamp, "circulating_supply": float(supply)}
+            for timestamp, (_, supply) in zip(_timestamps(_epoch_ms(points)), points)
+        )
+        return
+
+    for point_ms, supply in points:
+        yield {
+            "id": coin_id,
+            "timestamp": datetime.utcfromtimestamp(point_ms / 1000),
+            "circulating_supply": float(supply),
+        }
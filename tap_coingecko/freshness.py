@@ -0,0 +1,35 @@
+"""Publication cadence of CoinGecko time series."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from tap_coingecko.response_cache import DAILY_CLOSE_SECONDS
+
+# Seconds between consecutive points, and seconds after a point's timestamp
+# until CoinGecko serves it. Daily closes are published at 00:35 UTC.
+CADENCES = {
+    "5m": (300, 0),
+    "30m": (1800, 0),
+    "hourly": (3600, 0),
+    "daily": (86400, DAILY_CLOSE_SECONDS),
+}
+
+
+def next_data_at(bookmark: datetime, interval: str) -> datetime:
+    """Return the earliest time a point newer than `bookmark` can be served."""
+    step, delay = CADENCES[interval]
+    if bookmark.tzinfo is None:
+        bookmark = bookmark.replace(tzinfo=timezone.utc)
+    timestamp = bookmark.timestamp()
+    next_point = timestamp - timestamp % step + step
+    return datetime.fromtimestamp(next_point + delay, timezone.utc)
+
+
+def next_poll_at(now: float, interval: float, offset: float = 0) -> float:
+    """Return the first epoch time after `now` that is `offset` past a multiple of `interval`.
+
+    With a multiple of 300 as `interval`, polls follow CoinGecko's 5-minute
+    cache refreshes, `offset` seconds after each.
+    """
+    return now - (now - offset) % interval + interval
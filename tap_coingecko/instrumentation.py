@@ -0,0 +1,194 @@
+"""Run-wide timing of HTTP calls, partitions and streams."""
+
+from __future__ import annotations
+
+import enum
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from singer_sdk import metrics
+
+
+class Metric(str, enum.Enum):
+    """Names of the METRIC messages written by the tap."""
+
+    HTTP_REQUEST_TIMING = "http_request_timing"
+    PARTITION_TIMING = "partition_timing"
+    STREAM_TIMING = "stream_timing"
+
+
+@dataclass
+class StreamTimings:
+    """Totals of one stream for the run summary."""
+
+    requests: int = 0
+    cache_hits: int = 0
+    retries: int = 0
+    bytes: int = 0
+    request_seconds: float = 0.0
+    statuses: dict[str, int] = field(default_factory=dict)
+    partitions: int = 0
+    records: int = 0
+    fetch_seconds: float = 0.0
+    decode_seconds: float = 0.0
+    emit_seconds: float = 0.0
+    sync_seconds: float = 0.0
+
+
+class RunMetrics:
+    """Collect timings across threads and report them.
+
+    Every observation is written as a Singer METRIC message when `logger` is
+    set, and added to per-stream totals. The totals are written to
+    `summary_path` after each stream, as a Prometheus textfile when the path
+    ends in `.prom` and as JSON otherwise.
+    """
+
+    def __init__(
+        self, logger: logging.Logger | None = None, summary_path: str | None = None
+    ):
+        self._logger = logger
+        self._summary_path = summary_path
+        self._lock = threading.Lock()
+        self.streams: dict[str, StreamTimings] = {}
+
+    def _totals(self, stream: str) -> StreamTimings:
+        return self.streams.setdefault(stream, StreamTimings())
+
+    def _log(self, metric: Metric, value: float, tags: dict) -> None:
+        if self._logger is not None:
+            metrics.log(self._logger, metrics.Point("timer", metric, value, tags))
+
+    def observe_request(
+        self,
+        stream: str,
+        url: str,
+        response: requests.Response,
+        seconds: float,
+        retries: int = 0,
+        cached: bool = False,
+    ) -> None:
+        """Record one HTTP call, `seconds` including any retries."""
+        size = len(response.content or b"")
+        status = str(response.status_code)
+        with self._lock:
+            totals = self._totals(stream)
+            totals.requests += 1
+            totals.cache_hits += cached
+            totals.retries += retries
+            totals.bytes += size
+            totals.request_seconds += seconds
+            totals.statuses[status] = totals.statuses.get(status, 0) + 1
+        self._log(
+            Metric.HTTP_REQUEST_TIMING,
+            seconds,
+            {
+                "stream": stream,
+                "endpoint": urlsplit(url).path,
+                "http_status_code": response.status_code,
+                "bytes": size,
+                "retries": retries,
+                "cached": cached,
+            },
+        )
+
+    def observe_partition(
+        self,
+        stream: str,
+        context: dict | None,
+        records: int,
+        fetch_seconds: float,
+        decode_seconds: float,
+        emit_seconds: float,
+    ) -> None:
+        """Record one partition.
+
+        `fetch_seconds` is the time spent waiting on responses, `decode_seconds`
+        the time spent decoding them and building records, and `emit_seconds`
+        the time the SDK spent validating and writing those records.
+        """
+        with self._lock:
+            totals = self._totals(stream)
+            totals.partitions += 1
+            totals.records += records
+            totals.fetch_seconds += fetch_seconds
+            totals.decode_seconds += decode_seconds
+            totals.emit_seconds += emit_seconds
+        self._log(
+            Metric.PARTITION_TIMING,
+            fetch_seconds + decode_seconds + emit_seconds,
+            {
+                "stream": stream,
+                "context": context,
+                "records": records,
+                "fetch_seconds": round(fetch_seconds, 6),
+                "decode_seconds": round(decode_seconds, 6),
+                "emit_seconds": round(emit_seconds, 6),
+            },
+        )
+
+    def observe_stream(self, stream: str, seconds: float) -> None:
+        """Record the sync of a whole stream and refresh the summary file."""
+        with self._lock:
+            totals = self._totals(stream)
+            totals.sync_seconds += seconds
+            tags = {"stream": stream, **asdict(totals)}
+        self._log(Metric.STREAM_TIMING, seconds, tags)
+        if self._summary_path:
+            self.write_summary(self._summary_path)
+
+    def summary(self) -> dict[str, dict]:
+        """Return the totals of every stream as plain dicts."""
+        with self._lock:
+            return {name: asdict(totals) for name, totals in self.streams.items()}
+
+    def write_summary(self, path: str) -> None:
+        """Write the summary to `path`, replacing the previous one atomically."""
+        summary = self.summary()
+        if path.endswith(".prom"):
+            content = prometheus_text(summary)
+        else:
+            content = json.dumps(summary, indent=2)
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        tmp.write_text(content)
+        os.replace(tmp, target)
+
+
+PROMETHEUS_COUNTERS = {
+    "requests": "HTTP calls made.",
+    "cache_hits": "HTTP calls served from the response cache.",
+    "retries": "HTTP retries.",
+    "bytes": "Response bytes received.",
+    "request_seconds": "Seconds spent in HTTP calls, retries included.",
+    "partitions": "Partitions synced.",
+    "records": "Records emitted.",
+    "fetch_seconds": "Seconds spent waiting on responses.",
+    "decode_seconds": "Seconds spent decoding responses and building records.",
+    "emit_seconds": "Seconds spent validating and writing records.",
+    "sync_seconds": "Seconds spent syncing the stream.",
+}
+
+
+def prometheus_text(summary: dict[str, dict]) -> str:
+    """Render a run summary in the Prometheus text exposition format."""
+    lines = []
+    for key, help_text in PROMETHEUS_COUNTERS.items():
+        name = f"tap_coingecko_{key}_total"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for stream, totals in summary.items():
+            lines.append(f'{name}{{stream="{stream}"}} {totals[key]}')
+
+    name = "tap_coingecko_responses_total"
+    lines += [f"# HELP {name} HTTP responses by status.", f"# TYPE {name} counter"]
+    for stream, totals in summary.items():
+        for status, count in sorted(totals["statuses"].items()):
+            lines.append(f'{name}{{stream="{stream}",status="{status}"}} {count}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,91 @@
+"""Incremental decoding of large JSON objects with ijson."""
+
+from __future__ import annotations
+
+import io
+import typing as t
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - exercised without the extra installed
+    ijson = None
+
+_OPENING = {"start_map", "start_array"}
+_CLOSING = {"end_map", "end_array"}
+
+
+def require_ijson() -> None:
+    if ijson is None:
+        raise ImportError(
+            "streaming_decode requires ijson. "
+            "Install it with `pip install tap-coingecko[streaming]`."
+        )
+
+
+def _build(event: tuple, events: t.Iterator[tuple]) -> t.Any:
+    """Build the value that starts with `event` from the following events."""
+    builder = ijson.ObjectBuilder()
+    depth = 0
+    while True:
+        _, name, value = event
+        builder.event(name, value)
+        if name in _OPENING:
+            depth += 1
+        elif name in _CLOSING:
+            depth -= 1
+        if depth == 0:
+            return builder.value
+        event = next(events)
+
+
+def _skip(event: tuple, events: t.Iterator[tuple]) -> None:
+    """Consume the value that starts with `event` without building it."""
+    depth = 0
+    while True:
+        name = event[1]
+        if name in _OPENING:
+            depth += 1
+        elif name in _CLOSING:
+            depth -= 1
+        if depth == 0:
+            return
+        event = next(events)
+
+
+def _stringify_array(events: t.Iterator[tuple]) -> str:
+    """Return `str()` of the array that follows, building one element at a time."""
+    event = next(events)
+    if event[1] != "start_array":
+        return str(_build(event, events))
+
+    parts = []
+    for event in events:
+        if event[1] == "end_array":
+            break
+        parts.append(repr(_build(event, events)))
+    return f"[{', '.join(parts)}]"
+
+
+def stream_record(
+    content: bytes, stringify: t.Collection[str] = (), drop: t.Collection[str] = ()
+) -> dict:
+    """Decode the JSON object in `content` without building it all at once.
+
+    Top-level arrays named in `stringify` are turned into their `str()` form
+    element by element, so their parsed tree is never held in full. Top-level
+    keys named in `drop` are skipped without being built. Otherwise the result
+    equals `{**json.loads(content), **{k: str(v) for k in stringify}}`.
+    """
+    require_ijson()
+    events = ijson.parse(io.BytesIO(content), use_float=True)
+    record = {}
+    for prefix, name, value in events:
+        if prefix != "" or name != "map_key":
+            continue
+        if value in drop:
+            _skip(next(events), events)
+        elif value in stringify:
+            record[value] = _stringify_array(events)
+        else:
+            record[value] = _build(next(events), events)
+    return record
@@ -0,0 +1,41 @@
+"""`tap-coingecko-poll`: sync the tap, then keep polling its snapshot streams."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from tap_coingecko.tap import TapCoingecko
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Sync the tap, then re-sync its snapshot streams every "
+        "`poll_interval` seconds until stopped."
+    )
+    parser.add_argument(
+        "--config",
+        action="append",
+        default=[],
+        help="Config file, or ENV to read the environment. May be repeated.",
+    )
+    parser.add_argument("--state", help="State file of the initial sync.")
+    parser.add_argument("--catalog", help="Catalog file.")
+    args = parser.parse_args(argv)
+
+    TapCoingecko.print_version(print_fn=TapCoingecko.logger.info)
+    config_files, parse_env_config = TapCoingecko.config_from_cli_args(*args.config)
+    tap = TapCoingecko(
+        config=config_files,
+        state=args.state,
+        catalog=args.catalog,
+        parse_env_config=parse_env_config,
+        validate_config=True,
+    )
+    tap.sync_all()
+    tap.poll_snapshot_streams()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
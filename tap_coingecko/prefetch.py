@@ -0,0 +1,83 @@
+"""Ordered partition prefetching for tap-coingecko."""
+
+from __future__ import annotations
+
+import typing as t
+from collections import deque
+from concurrent.futures import Executor, Future
+
+
+class PartitionPrefetcher:
+    """Fetch upcoming partitions on an executor while the caller consumes them.
+
+    `prepare` runs on the calling (writer) thread, so it may safely read and
+    write stream state. It returns the requests a partition needs, usually one
+    url but possibly several, e.g. backfill windows. Only `fetch` runs on the
+    executor, which is either a thread pool or the asyncio engine from
+    `tap_coingecko.aio`. Results are handed back strictly in partition order,
+    which keeps RECORD and STATE messages ordered exactly as in a sequential
+    sync. `window` bounds the number of requests in flight or waiting to be
+    consumed; a partition is always admitted whole.
+    """
+
+    def __init__(
+        self,
+        contexts: t.Iterable[dict],
+        prepare: t.Callable[[dict], list],
+        fetch: t.Callable[[t.Any, dict], t.Any],
+        executor: Executor,
+        window: int,
+    ):
+        self._contexts = iter(contexts)
+        self._prepare = prepare
+        self._fetch = fetch
+        self._executor = executor
+        self._window = window
+        self._pending: deque[tuple[dict, list[tuple[t.Any, Future]]]] = deque()
+        self._in_flight = 0
+        self.finished = False
+
+    def _fill(self) -> None:
+        while self._in_flight < self._window:
+            context = next(self._contexts, None)
+            if context is None:
+                break
+            futures = [
+                (request, self._executor.submit(self._fetch, request, context))
+                for request in self._prepare(context)
+            ]
+            self._pending.append((context, futures))
+            self._in_flight += len(futures)
+
+    def take(self, context: dict) -> list[tuple[t.Any, Future]] | None:
+        """Return the (request, future) pairs of `context`.
+
+        Returns None if `context` is not next in line.
+
+        Partitions ahead of `context` that needed no requests may be skipped.
+        """
+        self._fill()
+        while self._pending and self._pending[0][0] != context:
+            if self._pending[0][1]:
+                break
+            self._pending.popleft()
+            self._fill()
+        if not self._pending or self._pending[0][0] != context:
+            self.close()
+            return None
+
+        _, futures = self._pending.popleft()
+        self._in_flight -= len(futures)
+        self._fill()
+        if not self._pending:
+            self.close()
+        return futures
+
+    def close(self) -> None:
+        """Cancel outstanding fetches. The executor is shared and stays open."""
+        for _, futures in self._pending:
+            for _, future in futures:
+                future.cancel()
+        self._pending.clear()
+        self._in_flight = 0
+        self.finished = True
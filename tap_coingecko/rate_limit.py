@@ -0,0 +1,112 @@
+"""Tap-wide request rate limiting for tap-coingecko."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import typing as t
+from email.utils import parsedate_to_datetime
+
+# Calls per minute allowed by each CoinGecko API plan.
+PLAN_RATE_LIMITS = {
+    "demo": 30,
+    "analyst": 500,
+    "lite": 500,
+    "pro": 1000,
+    "enterprise": 1000,
+}
+DEFAULT_RATE_LIMIT = 500
+
+# Seconds to pause after a 429 that carries no Retry-After header.
+DEFAULT_RETRY_AFTER = 60
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every request the tap makes.
+
+    Callers reserve a token and sleep outside the lock for however long the
+    reservation says, so concurrent threads and the asyncio engine queue up
+    fairly behind the same budget. `pause` pushes every reservation back, which
+    is how a 429 or an exhausted rate-limit header stops the whole tap at once.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        burst: int | None = None,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate_per_minute / 60
+        self.capacity = burst or max(1, int(self.rate * 10))
+        self._clock = clock
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: t.Mapping) -> TokenBucket:
+        """Build the bucket from `rate_limit_*` settings or the plan defaults.
+
+        The plan default is split evenly between shards, which share one API key.
+        """
+        plan = (config.get("subscription_level") or "").lower()
+        rate = config.get("rate_limit_per_minute") or PLAN_RATE_LIMITS.get(
+            plan, DEFAULT_RATE_LIMIT
+        ) / max(config.get("shard_count", 1), 1)
+        return cls(rate, burst=config.get("rate_limit_burst"))
+
+    def reserve(self) -> float:
+        """Take one token and return the seconds to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + max(0.0, now - self._updated) * self.rate,
+            )
+            self._updated = max(now, self._updated)
+            self._tokens -= 1
+            return max(0.0, self._updated - now) + max(0.0, -self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        """Block the calling thread until a request may be sent."""
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Suspend the calling coroutine until a request may be sent."""
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for `seconds` and drop any saved-up burst."""
+        with self._lock:
+            self._updated = max(self._updated, self._clock() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def observe(self, status_code: int, headers: t.Mapping[str, str]) -> None:
+        """Adapt to throttling signals returned by the API."""
+        if status_code == 429:
+            retry_after = retry_after_seconds(headers)
+            self.pause(DEFAULT_RETRY_AFTER if retry_after is None else retry_after)
+            return
+
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is not None and reset is not None and float(remaining) < 1:
+            reset = float(reset)
+            # The reset header is either an epoch timestamp or a delay in seconds.
+            self.pause(reset - time.time() if reset > 1e9 else reset)
+
+
+def retry_after_seconds(headers: t.Mapping[str, str]) -> float | None:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
@@ -0,0 +1,177 @@
+"""Size-bounded, compressed on-disk cache of CoinGecko API responses."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "tap-coingecko" / "responses"
+
+# CoinGecko refreshes its cached API data every 5 minutes. The last completed
+# UTC day is published at 00:35 UTC, after which it no longer changes.
+REFRESH_SECONDS = 300
+DAILY_CLOSE_SECONDS = 35 * 60
+IMMUTABLE_TTL = 7 * 24 * 3600
+
+# Pagination headers are part of the payload. Rate limit headers are not kept,
+# they would feed stale quotas to the rate limiter.
+CACHED_HEADERS = ("content-type", "link", "per-page", "total")
+
+
+def normalize_url(url: str) -> str:
+    """Return `url` with its query parameters sorted, so equal requests share a key."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+def published_until(now: float) -> float:
+    """Return the end of the last UTC day CoinGecko has published in full."""
+    published_at = now - DAILY_CLOSE_SECONDS
+    return published_at - published_at % 86400
+
+
+def history_day_end(date: str) -> float | None:
+    """Return the end of the UTC day a `/history` `date` (dd-mm-yyyy) names."""
+    try:
+        day = datetime.strptime(date, "%d-%m-%Y").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return day.timestamp() + 86400
+
+
+def expires_at(url: str, now: float) -> float:
+    """Return when a response for `url` fetched at `now` may have changed upstream.
+
+    Snapshots of days and range requests ending before the last published day
+    are final. Anything else, today's snapshot included, may change with the
+    next 5-minute refresh.
+    """
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    if parts.path.endswith("/history"):
+        day_end = history_day_end(params.get("date", ""))
+        if day_end is not None and day_end <= published_until(now):
+            return now + IMMUTABLE_TTL
+    if parts.path.endswith("/range") and float(params.get("to", now)) <= (
+        published_until(now)
+    ):
+        return now + IMMUTABLE_TTL
+    return now - now % REFRESH_SECONDS + REFRESH_SECONDS
+
+
+class ResponseCache:
+    """Serve repeated GETs from disk until CoinGecko would have new data for them.
+
+    Successful responses are stored gzip-compressed under a hash of their
+    normalized url and expire on the schedule of `expires_at`, so retried or
+    overlapping runs reuse what is still current instead of spending API
+    credits. Once the files exceed `max_bytes` the least recently used ones are
+    evicted. The cache is safe to share between threads and between processes
+    using the same directory.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None,
+        max_bytes: int,
+        clock: t.Callable[[], float] = time.time,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sizes: OrderedDict[Path, int] = OrderedDict()
+        self._total = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for path in sorted(
+            self.cache_dir.glob("*.gz"), key=lambda p: p.stat().st_mtime
+        ):
+            self._track(path, path.stat().st_size)
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(normalize_url(url).encode()).hexdigest()[:32]
+        return self.cache_dir / f"{digest}.gz"
+
+    def _track(self, path: Path, size: int) -> None:
+        self._total += size - self._sizes.pop(path, 0)
+        self._sizes[path] = size
+
+    def _forget(self, path: Path) -> None:
+        self._total -= self._sizes.pop(path, 0)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def get(self, url: str) -> requests.Response | None:
+        """Return the cached response for `url`, or None if missing or expired."""
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rb") as f:
+                meta = json.loads(f.readline())
+                if meta["expires_at"] <= self._clock():
+                    content = None
+                else:
+                    content = f.read()
+        except (FileNotFoundError, OSError, ValueError, EOFError):
+            return None
+
+        with self._lock:
+            if content is None:
+                self._forget(path)
+                return None
+            if path in self._sizes:
+                self._sizes.move_to_end(path)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = meta["url"]
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response._content = content
+        return response
+
+    def put(self, url: str, response: requests.Response) -> None:
+        """Store a successful response for `url`."""
+        if response.status_code != 200:
+            return
+
+        meta = {
+            "url": response.url or url,
+            "headers": {
+                name: response.headers[name]
+                for name in CACHED_HEADERS
+                if name in response.headers
+            },
+            "expires_at": expires_at(url, self._clock()),
+        }
+        path = self._path(url)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, "wb", compresslevel=5) as f:
+            f.write(json.dumps(meta).encode() + b"\n")
+            f.write(response.content)
+        size = tmp_path.stat().st_size
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._track(path, size)
+            while self._total > self.max_bytes and len(self._sizes) > 1:
+                self._forget(next(iter(self._sizes)))
@@ -0,0 +1,96 @@
+"""Split the coins of one sync across several tap processes, and merge their state.
+
+Each process runs with the same config plus its own `shard_index` out of
+`shard_count`, and syncs only the coins whose stable hash falls in its shard.
+The state files the shards write are combined with
+
+    tap-coingecko-merge-state state-0.json state-1.json ... > state.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import typing as t
+import zlib
+
+from dateutil.parser import parse
+
+from tap_coingecko.coverage import add_range
+
+
+def shard_of(coin_id: str, shard_count: int) -> int:
+    """Return the shard owning `coin_id`, the same in every process and run."""
+    return zlib.crc32(coin_id.encode()) % shard_count
+
+
+def _is_newer(entry: dict, other: dict) -> bool:
+    """Whether `entry` has a later bookmark than `other`."""
+    value = entry.get("replication_key_value")
+    if value is None:
+        return False
+    other_value = other.get("replication_key_value")
+    return other_value is None or parse(value) > parse(other_value)
+
+
+def _merge_entries(entry: dict, other: dict) -> dict:
+    """Prefer the entry with the later bookmark, keeping the covered ranges of both."""
+    if _is_newer(other, entry):
+        entry, other = other, entry
+    merged = {**other, **entry}
+    covered = entry.get("covered", [])
+    for start, end in other.get("covered", []):
+        covered = add_range(covered, start, end)
+    if covered:
+        merged["covered"] = covered
+    return merged
+
+
+def merge_states(states: t.Iterable[dict]) -> dict:
+    """Merge the state of several shards into one.
+
+    Shards pass through the bookmarks of partitions they do not own, so the
+    same partition can appear in several states: the later bookmark wins.
+    """
+    bookmarks: dict[str, dict] = {}
+    for state in states:
+        for stream_name, stream_state in state.get("bookmarks", {}).items():
+            merged = bookmarks.setdefault(stream_name, {})
+            partitions = {
+                json.dumps(p["context"], sort_keys=True): p
+                for p in merged.get("partitions", [])
+            }
+            for partition in stream_state.get("partitions", []):
+                key = json.dumps(partition["context"], sort_keys=True)
+                partitions[key] = (
+                    _merge_entries(partitions[key], partition)
+                    if key in partitions
+                    else partition
+                )
+
+            stream_keys = {k: v for k, v in stream_state.items() if k != "partitions"}
+            current_keys = {k: v for k, v in merged.items() if k != "partitions"}
+            merged.clear()
+            merged.update(_merge_entries(current_keys, stream_keys))
+            if partitions:
+                merged["partitions"] = list(partitions.values())
+    return {"bookmarks": bookmarks}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Merge the state files of shards.")
+    parser.add_argument("states", nargs="+", help="State files written by each shard.")
+    args = parser.parse_args(argv)
+
+    states = []
+    for path in args.states:
+        with open(path) as f:
+            states.append(json.load(f))
+    json.dump(merge_states(states), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Hand payloads fetched by one stream to later streams of the same run."""
+
+from __future__ import annotations
+
+import json
+import threading
+import typing as t
+import zlib
+
+
+class SharedPayloads:
+    """Compressed in-memory store of decoded payloads, each taken once.
+
+    A stream that makes the larger call for a coin offers the part another
+    selected stream would otherwise request again. The consuming stream checks
+    for it when planning its requests and takes it when syncing the coin, which
+    evicts it. Payloads are kept as compressed JSON, so holding them for every
+    coin of a run stays small.
+    """
+
+    def __init__(self):
+        self._payloads: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def offer(self, key: str, payload: t.Any) -> None:
+        data = zlib.compress(json.dumps(payload).encode(), 1)
+        with self._lock:
+            self._payloads[key] = data
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._payloads
+
+    def take(self, key: str) -> t.Any | None:
+        """Return and evict the payload offered under `key`, if any."""
+        with self._lock:
+            data = self._payloads.pop(key, None)
+        return None if data is None else json.loads(zlib.decompress(data))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._payloads)
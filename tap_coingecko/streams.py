@@ -4,12 +4,28 @@ from __future__ import annotations
 
 import sys
 import typing as t
-import requests
 from singer_sdk import typing as th
-from tap_coingecko.client import CoingeckoStream, DynamicIDCoingeckoStream
+from tap_coingecko.archive import json_response
+from tap_coingecko.backfill import MAX_RANGE_DAYS, plan_windows
+from tap_coingecko.coverage import add_range, find_gaps, in_gaps, plan_requests
+from tap_coingecko.client import (
+    BatchedIdsCoingeckoStream,
+    CoingeckoStream,
+    DynamicIDCoingeckoStream,
+)
+from tap_coingecko.decode import (
+    circulating_supply_records,
+    market_chart_columns,
+    market_chart_records,
+    ohlc_columns,
+    ohlc_records,
+    to_epoch_ms,
+)
 import importlib.resources as importlib_resources
 from urllib.parse import urlencode
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from itertools import count, takewhile
 from singer_sdk import typing as th
 
 from dateutil.parser import parse
@@ -43,19 +59,10 @@ class CoinListStream(CoingeckoStream):
     def request_records(self, context: dict | None) -> Iterable[dict]:
         """
         Request records from REST endpoint(s), returning response records.
-        If pagination is detected, pages will be recursed automatically.
+        The list is shared with the `ids: "*"` streams through the coin list cache.
         """
-        endpoint = self.endpoint
-        stream_params = self.config.get("stream_params").get(self.name).copy()
-        if stream_params:
-            stream_params = urlencode(stream_params)
-            endpoint = f"{self.endpoint}?{stream_params}"
-
-        result = requests.get(
-            endpoint, headers={"x-cg-pro-api-key": self.config.get("api_key")}
-        )
-        for record in result.json():
-            yield record
+        for record in self.get_coin_list():
+            yield dict(record)
 
 
 class SupportedCurrenciesStream(CoingeckoStream):
@@ -68,10 +75,8 @@ class SupportedCurrenciesStream(CoingeckoStream):
     schema = th.PropertiesList(th.Property("ticker", th.StringType)).to_dict()
 
     def request_records(self, context: dict | None) -> Iterable[dict]:
-        result = requests.get(
-            self.endpoint, headers={"x-cg-pro-api-key": self.config.get("api_key")}
-        )
-        for record in [{"ticker": value} for value in result.json()]:
+        result = self.request_json(self.endpoint, context)
+        for record in [{"ticker": value} for value in result]:
             yield record
 
 
@@ -81,6 +86,7 @@ class TopGainersLosersStream(CoingeckoStream):
     name = "top_gainers_losers"
     path = "/coins/top_gainers_losers"
     replication_key = None
+    pollable = True
 
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
@@ -104,10 +110,7 @@ class TopGainersLosersStream(CoingeckoStream):
             stream_params = urlencode(stream_params)
             endpoint = f"{self.endpoint}?{stream_params}"
 
-        result = requests.get(
-            endpoint, headers={"x-cg-pro-api-key": self.config.get("api_key")}
-        )
-        result = result.json()
+        result = self.request_json(endpoint, context)
         for key in result.keys():
             for record in result[key]:
                 record["source"] = key
@@ -120,6 +123,7 @@ class RecentlyAddedCoinsStream(CoingeckoStream):
     name = "recently_added_coins"
     path = "/coins/list/new"
     replication_key = None
+    pollable = True
 
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
@@ -129,22 +133,21 @@ class RecentlyAddedCoinsStream(CoingeckoStream):
     ).to_dict()
 
     def request_records(self, context: dict | None) -> Iterable[dict]:
-        response = requests.get(
-            self.endpoint, headers={"x-cg-pro-api-key": self.config.get("api_key")}
-        )
-        for record in response.json():
+        response = self.request_json(self.endpoint, context)
+        for record in response:
             record["activated_at"] = datetime.fromtimestamp(record["activated_at"])
             yield record
 
 
 class CoinsListWithMarketDataStream(CoingeckoStream):
-    """Coingecko Recently Added Coins Stream."""
+    """Coingecko Coins List With Market Data Stream."""
 
-    # TODO: Need to implement pagination.
+    max_per_page = 250
 
     name = "coins_list_with_market_data"
     path = "/coins/markets"
     replication_key = None
+    pollable = True
 
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
@@ -176,20 +179,103 @@ class CoinsListWithMarketDataStream(CoingeckoStream):
         th.Property("roi", th.CustomType(CUSTOM_JSON_SCHEMA)),
     ).to_dict()
 
-    def request_records(self, context: dict | None) -> Iterable[dict]:
+    @property
+    def per_page(self) -> int:
+        """The configured page size, clamped to what the API returns at most."""
+        stream_params = self.config.get("stream_params").get(self.name)
+        return min(
+            int(stream_params.get("per_page", self.max_per_page)), self.max_per_page
+        )
+
+    def get_page_url(self, page_context: dict) -> str:
         stream_params = self.config.get("stream_params").get(self.name).copy()
-        self.raise_dynamic_token_ids_not_allowed()
+        stream_params["per_page"] = self.per_page
+        stream_params["page"] = page_context["page"]
+        return f"{self.endpoint}?{urlencode(stream_params)}"
 
-        endpoint = self.endpoint
-        if stream_params:
-            stream_params = urlencode(stream_params)
-            endpoint = f"{self.endpoint}?{stream_params}"
+    def request_records(self, context: dict | None) -> Iterable[dict]:
+        """
+        Page through /coins/markets, fetching the upcoming pages concurrently.
+        Pages are yielded in order and no page past the first short one is
+        requested, apart from those the prefetch window already sent.
+        """
+        self.raise_dynamic_token_ids_not_allowed()
 
-        response = requests.get(
-            endpoint, headers={"x-cg-pro-api-key": self.config.get("api_key")}
+        last_page = None
+        pages = takewhile(
+            lambda page_context: last_page is None,
+            ({"page": page} for page in count(1)),
         )
-        for record in response.json():
-            yield record
+        prepare = lambda page_context: [self.get_page_url(page_context)]
+        prefetcher = self.new_prefetcher(pages, prepare=prepare)
+
+        page = 1
+        while last_page is None:
+            [response] = self.fetch_urls(prefetcher, {"page": page}, prepare)
+            records = response.json()
+            for record in records:
+                yield record
+
+            if len(records) < self.per_page:
+                last_page = page
+            page += 1
+
+        if prefetcher is not None:
+            prefetcher.close()
+
+
+class CoinMarketsByIdsStream(BatchedIdsCoingeckoStream):
+    """Coingecko market snapshot of many ids, 250 coins per /coins/markets call."""
+
+    name = "coin_markets_by_ids"
+    path = "/coins/markets"
+    replication_key = None
+
+    schema = CoinsListWithMarketDataStream.schema
+
+    def get_batch_url(self, batch_context: dict) -> str:
+        url_params = self.stream_params.copy()
+        url_params["ids"] = batch_context["ids"]
+        url_params["per_page"] = self.max_ids_per_request
+        return f"{self.endpoint}?{urlencode(url_params)}"
+
+
+class SimplePriceStream(BatchedIdsCoingeckoStream):
+    """Coingecko price snapshot of many ids per /simple/price call."""
+
+    name = "simple_price"
+    path = "/simple/price"
+    replication_key = None
+    max_ids_per_request = 500
+
+    schema = th.PropertiesList(
+        th.Property("id", th.StringType),
+        th.Property("vs_currency", th.StringType),
+        th.Property("price", th.NumberType),
+        th.Property("market_cap", th.NumberType),
+        th.Property("volume_24h", th.NumberType),
+        th.Property("change_24h", th.NumberType),
+        th.Property("last_updated_at", th.DateTimeType),
+    ).to_dict()
+
+    def parse_batch(self, result: dict) -> Iterable[dict]:
+        vs_currencies = [
+            i.strip() for i in self.stream_params["vs_currencies"].split(",")
+        ]
+        for coin_id, prices in result.items():
+            last_updated_at = prices.get("last_updated_at")
+            if last_updated_at:
+                last_updated_at = datetime.utcfromtimestamp(last_updated_at)
+            for vs_currency in vs_currencies:
+                yield {
+                    "id": coin_id,
+                    "vs_currency": vs_currency,
+                    "price": prices.get(vs_currency),
+                    "market_cap": prices.get(f"{vs_currency}_market_cap"),
+                    "volume_24h": prices.get(f"{vs_currency}_24h_vol"),
+                    "change_24h": prices.get(f"{vs_currency}_24h_change"),
+                    "last_updated_at": last_updated_at,
+                }
 
 
 class CoinDataByIdStream(DynamicIDCoingeckoStream):
@@ -199,6 +285,14 @@ class CoinDataByIdStream(DynamicIDCoingeckoStream):
     path = "/coins"
     replication_key = None
 
+    property_query_flags = {
+        "localization": "localization",
+        "tickers": "tickers",
+        "market_data": "market_data",
+        "community_data": "community_data",
+        "developer_data": "developer_data",
+    }
+
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("symbol", th.StringType),
@@ -270,78 +364,206 @@ class CoinDataByIdStream(DynamicIDCoingeckoStream):
 
         if self.stream_params:
             url_params.pop("ids") if "ids" in url_params else url_params.pop("id")
+            url_params.update(self.selection_query_flags())
             encoded_params = urlencode(url_params)
             url = f"{url}?{encoded_params}"
         return url
 
-    def request_records(self, context: dict | None) -> Iterable[dict]:
-        url = self.get_url(context)
-        response = requests.get(
-            url, headers={"x-cg-pro-api-key": self.config.get("api_key")}
-        )
-        self.logger.info(f" *** Running ticker {self.ticker} ***")
-        yield response.json()
+    @cached_property
+    def ticker_consumer_ids(self) -> frozenset[str]:
+        """Return the ids whose tickers `coin_tickers_by_id` takes from this stream."""
+        tickers_stream = self._tap.streams.get(CoinTickersByIdStream.name)
+        if (
+            self.replaying
+            or tickers_stream is None
+            or not tickers_stream.selected
+            or not tickers_stream.accepts_coin_data_tickers(self.stream_params)
+        ):
+            return frozenset()
+        return frozenset(p["id"] for p in tickers_stream.partitions)
+
+    def selection_query_flags(self) -> dict[str, str]:
+        flags = super().selection_query_flags()
+        if self.ticker_consumer_ids:
+            # coin_tickers_by_id still takes the tickers.
+            flags.pop("tickers", None)
+        return flags
 
-    def post_process(self, row: dict, context: dict | None = None) -> dict | None:
-        row["tickers"] = str(row["tickers"])
-        return row
+    def request_records(self, context: dict | None) -> Iterable[dict]:
+        """
+        Request /coins/{id}. Complete ticker lists are also handed to
+        `coin_tickers_by_id`, when selected, so it does not request them again.
+        """
+        self.logger.info(f" *** Running ticker {context['id']} ***")
+        # The response is not bound to a name, so its body is released once
+        # decoded instead of living on while the record is consumed.
+        if context["id"] not in self.ticker_consumer_ids:
+            yield self.decode_record(
+                self.fetch_partition(context), stringify=["tickers"]
+            )
+            return
+
+        record = self.fetch_partition(context).json()
+        self.share_tickers(context["id"], record)
+        self.drop_deselected(record)
+        if "tickers" in record:
+            record["tickers"] = str(record["tickers"])
+        yield record
+
+    def share_tickers(self, coin_id: str, record: dict) -> None:
+        """Offer a complete ticker list of `record` to `coin_tickers_by_id`."""
+        tickers = record.get("tickers")
+        # /coins/{id} returns at most one page of tickers.
+        if (
+            isinstance(tickers, list)
+            and len(tickers) < CoinTickersByIdStream.max_per_page
+        ):
+            self._tap.shared_payloads.offer(
+                CoinTickersByIdStream.shared_key(coin_id),
+                {"name": record.get("name"), "tickers": tickers},
+            )
 
 
 class CoinTickersByIdStream(DynamicIDCoingeckoStream):
-    """Coingecko Tickers By Id Stream."""
+    """Coingecko Tickers By Id Stream, one record per exchange market."""
 
-    # TODO: Need to implement pagination.
+    max_per_page = 100
 
     name = "coin_tickers_by_id"
     path = "/coins"
+    primary_keys = ["id", "market_identifier", "base", "target"]
     replication_key = None
 
     schema = th.PropertiesList(
-        th.Property("name", th.StringType),
         th.Property("id", th.StringType),
-        th.Property("tickers", th.StringType),
+        th.Property("name", th.StringType),
+        th.Property("base", th.StringType),
+        th.Property("target", th.StringType),
+        th.Property("market_name", th.StringType),
+        th.Property("market_identifier", th.StringType),
+        th.Property("market_has_trading_incentive", th.BooleanType),
+        th.Property("market_logo", th.StringType),
+        th.Property("last", th.NumberType),
+        th.Property("volume", th.NumberType),
+        th.Property("cost_to_move_up_usd", th.NumberType),
+        th.Property("cost_to_move_down_usd", th.NumberType),
+        th.Property("converted_last_btc", th.NumberType),
+        th.Property("converted_last_eth", th.NumberType),
+        th.Property("converted_last_usd", th.NumberType),
+        th.Property("converted_volume_btc", th.NumberType),
+        th.Property("converted_volume_eth", th.NumberType),
+        th.Property("converted_volume_usd", th.NumberType),
+        th.Property("trust_score", th.StringType),
+        th.Property("bid_ask_spread_percentage", th.NumberType),
+        th.Property("timestamp", th.DateTimeType),
+        th.Property("last_traded_at", th.DateTimeType),
+        th.Property("last_fetch_at", th.DateTimeType),
+        th.Property("is_anomaly", th.BooleanType),
+        th.Property("is_stale", th.BooleanType),
+        th.Property("trade_url", th.StringType),
+        th.Property("token_info_url", th.StringType),
+        th.Property("coin_id", th.StringType),
+        th.Property("target_coin_id", th.StringType),
+        th.Property("coin_mcap_usd", th.NumberType),
     ).to_dict()
 
-    def get_url(self, context: dict | None) -> str:
-        state = self.get_context_state(context)
-        starting_date = self.get_starting_timestamp(context)
-
-        if starting_date:
-            starting_date = starting_date.date()
+    def get_page_url(self, page_context: dict) -> str:
+        url_params = self.stream_params.copy()
+        url_params.pop("ids", None)
+        url_params.pop("id", None)
+        url_params["page"] = page_context["page"]
+        url = f"{self.url_base}{self.path}/{page_context['id']}/tickers"
+        return f"{url}?{urlencode(url_params)}"
 
-        if state and "context" in state.keys() and "id" in state["context"].keys():
-            self.ticker = state["context"]["id"]
-        else:
-            self.ticker = self.stream_params["id"]
+    @staticmethod
+    def shared_key(coin_id: str) -> str:
+        return f"tickers/{coin_id}"
 
-        if starting_date and "days" in self.stream_params.keys():
-            self.stream_params["days"] = min(
-                (datetime.utcnow().date() - starting_date).days,
-                self.stream_params["days"],
-            )
+    def accepts_coin_data_tickers(self, coin_data_params: dict) -> bool:
+        """Whether /coins/{id} tickers requested with `coin_data_params` match ours.
 
-        url_params = self.stream_params.copy()
-        url = f"{self.url_base}{self.path}/{self.ticker}/tickers"
+        Exchange logos, order book depth and exchange filters are only served
+        by /coins/{id}/tickers.
+        """
+        if str(coin_data_params.get("tickers", "true")).lower() != "true":
+            return False
+        if any(
+            str(self.stream_params.get(flag, "false")).lower() == "true"
+            for flag in ("include_exchange_logo", "depth")
+        ):
+            return False
+        return not self.stream_params.get("exchange_ids") and (
+            self.stream_params.get("dex_pair_format")
+            == coin_data_params.get("dex_pair_format")
+        )
 
-        if self.stream_params:
-            url_params.pop("ids") if "ids" in url_params else url_params.pop("id")
-            encoded_params = urlencode(url_params)
-            url = f"{url}?{encoded_params}"
-        return url
+    def get_partition_urls(self, context: dict) -> list[str]:
+        if self.shared_key(context["id"]) in self._tap.shared_payloads:
+            return []
+        return [self.get_page_url({**context, "page": 1})]
+
+    def parse_tickers(self, result: dict, context: dict) -> Iterable[dict]:
+        for ticker in result["tickers"]:
+            market = ticker.pop("market", None) or {}
+            converted_last = ticker.pop("converted_last", None) or {}
+            converted_volume = ticker.pop("converted_volume", None) or {}
+            yield {
+                **ticker,
+                "id": context["id"],
+                "name": result.get("name"),
+                "market_name": market.get("name"),
+                "market_identifier": market.get("identifier"),
+                "market_has_trading_incentive": market.get("has_trading_incentive"),
+                "market_logo": market.get("logo"),
+                **{f"converted_last_{k}": v for k, v in converted_last.items()},
+                **{f"converted_volume_{k}": v for k, v in converted_volume.items()},
+            }
 
     def request_records(self, context: dict | None) -> Iterable[dict]:
-        url = self.get_url(context)
+        """
+        Page through /coins/{id}/tickers. When the first page reports the ticker
+        count in its `total` header the remaining pages are fetched concurrently,
+        otherwise paging continues until a short page is returned. Coins whose
+        tickers came with the coin_data_by_id response are not requested again.
+        """
+        shared = self._tap.shared_payloads.take(self.shared_key(context["id"]))
+        if shared is not None:
+            # Archived as the first page, which is what a replay parses it as.
+            url = self.get_page_url({**context, "page": 1})
+            self.archive_call([json_response(url, shared)])
+            yield from self.parse_tickers(shared, context)
+            return
+
+        response = self.fetch_partition(context)
+        result = response.json()
+        assert (
+            isinstance(result, dict) and "error" not in result
+        ), f"response returned an error for coin {context['id']}"
+        yield from self.parse_tickers(result, context)
 
-        response = requests.get(
-            url, headers={"x-cg-pro-api-key": self.config.get("api_key")}
-        )
-        yield response.json()
+        if len(result["tickers"]) < self.max_per_page:
+            return
+
+        total = int(response.headers.get("total", 0))
+        pages = [
+            {**context, "page": page}
+            for page in range(2, -(-total // self.max_per_page) + 1)
+        ]
+        prepare = lambda page_context: [self.get_page_url(page_context)]
+        prefetcher = self.new_prefetcher(pages, prepare=prepare) if pages else None
+
+        page = 2
+        while True:
+            [response] = self.fetch_urls(prefetcher, {**context, "page": page}, prepare)
+            result = response.json()
+            yield from self.parse_tickers(result, context)
 
-    def post_process(self, row: dict, context: dict | None = None) -> dict | None:
-        self.logger.info(f"*** {row} ***")
-        if "tickers" in row.keys():
-            row["tickers"] = str(row["tickers"])
-        return row
+            if len(result["tickers"]) < self.max_per_page:
+                break
+            page += 1
+
+        if prefetcher is not None:
+            prefetcher.close()
 
 
 class CoinHistoricalDataByIdStream(CoingeckoStream):
@@ -351,6 +573,8 @@ class CoinHistoricalDataByIdStream(CoingeckoStream):
     path = "/coins"
     replication_key = None
 
+    property_query_flags = {"localization": "localization"}
+
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("symbol", th.StringType),
@@ -370,13 +594,12 @@ class CoinHistoricalDataByIdStream(CoingeckoStream):
 
         endpoint = f"{self.endpoint}/{self.stream_params['id']}/history"
         if self.stream_params:
-            encoded_params = urlencode(self.stream_params)
+            encoded_params = urlencode(
+                {**self.stream_params, **self.selection_query_flags()}
+            )
             endpoint = f"{endpoint}?{encoded_params}"
 
-        response = requests.get(
-            endpoint, headers={"x-cg-pro-api-key": self.config.get("api_key")}
-        )
-        yield response.json()
+        yield self.drop_deselected(self.request_json(endpoint, context))
 
 
 class CoinHistoricalDataChartByIdStream(DynamicIDCoingeckoStream):
@@ -387,6 +610,7 @@ class CoinHistoricalDataChartByIdStream(DynamicIDCoingeckoStream):
     primary_keys = ["timestamp", "id"]
     replication_key = "timestamp"
     is_sorted = True
+    trusted_schema = True
 
     schema = th.PropertiesList(
         th.Property("timestamp", th.DateTimeType),
@@ -396,6 +620,15 @@ class CoinHistoricalDataChartByIdStream(DynamicIDCoingeckoStream):
         th.Property("volume", th.NumberType),
     ).to_dict()
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._coverage_plans: dict[str, tuple[list, list]] = {}
+
+    @property
+    def data_interval(self) -> str | None:
+        # Automatic granularity is 5-minutely for the most recent day.
+        return self.stream_params.get("interval") or "5m"
+
     def raise_coingecko_non_enterprise_warning(self):
         if self.config.get("subscription_level").lower() != "enterprise":
             self.logger.warning(
@@ -518,39 +751,178 @@ class CoinHistoricalDataChartByIdStream(DynamicIDCoingeckoStream):
 
         return url
 
-    def request_records(self, context: dict | None) -> Iterable[dict]:
-        url = self.get_url(context)
-        response = requests.get(
-            url, headers={"x-cg-pro-api-key": self.config.get("api_key")}
+    def get_backfill_start(self, context: dict | None) -> datetime | None:
+        """Return the earliest timestamp this partition still has to fetch."""
+        start = self.get_starting_timestamp(context)
+        if "days" in self.stream_params:
+            days_start = datetime.now(timezone.utc) - timedelta(
+                days=self.stream_params["days"]
+            )
+            start = max(start, days_start) if start else days_start
+        return start
+
+    def get_range_url(self, context: dict, start: datetime, end: datetime) -> str:
+        url_params = self.config.get("stream_params").get(self.name).copy()
+        for param in ("ids", "id", "days"):
+            url_params.pop(param, None)
+        url_params["from"] = int(start.timestamp())
+        url_params["to"] = int(end.timestamp())
+        url = f"{self.url_base}{self.path}/{context['id']}/market_chart/range"
+        return f"{url}?{urlencode(url_params)}"
+
+    def get_partition_urls(self, context: dict) -> list[str]:
+        """
+        Enterprise backfills wider than one `days` request allows at the chosen
+        interval are split into /market_chart/range windows instead of falling back
+        to the coarser `days=max`. The windows are fetched concurrently by the
+        request engine and stitched back together in `request_records`.
+        """
+        if self.coverage_enabled:
+            gaps, windows = self.get_coverage_plan(context)
+            self._coverage_plans[context["id"]] = (gaps, windows)
+            return [
+                self.get_range_url(
+                    context,
+                    datetime.fromtimestamp(start, timezone.utc),
+                    datetime.fromtimestamp(end, timezone.utc),
+                )
+                for start, end in windows
+            ]
+
+        interval = self.stream_params.get("interval")
+        max_days = MAX_RANGE_DAYS.get(interval)
+        if max_days is None or self.config.get("subscription_level").lower() != (
+            "enterprise"
+        ):
+            return [self.get_url(context)]
+
+        start = self.get_backfill_start(context)
+        end = datetime.now(timezone.utc)
+        if start is None or end - start <= timedelta(days=max_days):
+            return [self.get_url(context)]
+
+        return [
+            self.get_range_url(context, window_start, window_end)
+            for window_start, window_end in plan_windows(start, end, interval)
+        ]
+
+    @property
+    def coverage_enabled(self) -> bool:
+        """Whether synced ranges are tracked in state, see `get_coverage_plan`."""
+        return self.config.get("track_coverage", False) and (
+            self.config.get("subscription_level").lower() == "enterprise"
         )
 
-        result = response.json()
+    @property
+    def check_sorted(self) -> bool:
+        # Repairing a gap emits points older than the partition bookmark.
+        return not self.coverage_enabled
 
+    def get_coverage_plan(self, context: dict) -> tuple[list, list]:
+        """
+        Return the parts of the configured time range missing from the partition's
+        `covered` index in state, and the /market_chart/range windows that fill them
+        in as few requests as the interval's range limit allows.
+        """
+        end = int(datetime.now(timezone.utc).timestamp())
+        starts = []
+        if self.config.get("start_date"):
+            starts.append(to_epoch_ms(parse(self.config["start_date"])) // 1000)
+        if isinstance(self.stream_params.get("days"), int):
+            starts.append(end - self.stream_params["days"] * 86400)
         assert (
-            "error" not in result.keys()
-        ), f"response returned an error for coin {context['id']}"
+            starts
+        ), f"track_coverage needs start_date or numeric days for {self.name}"
 
-        replication_timestamp = self.get_starting_replication_key_value(context)
-        if replication_timestamp:
-            last_timestamp = datetime.fromisoformat(replication_timestamp).replace(
-                tzinfo=None
-            )
+        covered = self.get_context_state(context).get("covered", [])
+        gaps = find_gaps(covered, int(max(starts)), end)
+        max_days = MAX_RANGE_DAYS.get(self.stream_params.get("interval"))
+        return gaps, plan_requests(gaps, max_days * 86400 if max_days else None)
 
-        for price, market_cap, volume in zip(
-            result["prices"], result["market_caps"], result["total_volumes"]
-        ):
-            entry = {
-                "timestamp": datetime.utcfromtimestamp(
-                    min(price[0] / 1000, market_cap[0] / 1000, volume[0] / 1000)
-                ),
-                "id": self.ticker,
-                "price": price[1],
-                "market_cap": market_cap[1],
-                "volume": volume[1],
-            }
+    def request_gap_records(self, context: dict) -> Iterable[dict]:
+        """Emit the points inside the partition's gaps and record them as covered."""
+        assert not self.replaying, "track_coverage syncs cannot be replayed"
+        state = self.get_context_state(context)
+        responses = self.fetch_partition_responses(context)
+        gaps, windows = self._coverage_plans.pop(context["id"])
+
+        since_ms = None
+        for (start, end), response in zip(windows, responses):
+            result = response.json()
+            assert (
+                "error" not in result.keys()
+            ), f"response returned an error for coin {context['id']}"
+
+            for record in market_chart_records(result, context["id"], since_ms):
+                point_ms = to_epoch_ms(record["timestamp"])
+                since_ms = point_ms + 1
+                if in_gaps(gaps, point_ms / 1000):
+                    yield record
+
+            # The newest points may not be published yet, so the last window
+            # only counts as covered up to just past the last point it
+            # returned, which keeps that point out of the next gap.
+            if end == windows[-1][1]:
+                covered_to = since_ms // 1000 + 1 if since_ms else start
+                end = min(end, max(start, covered_to))
+            state["covered"] = add_range(state.get("covered", []), start, end)
+
+    def _increment_stream_state(
+        self, latest_record: dict, *, context: dict | None = None
+    ) -> None:
+        """Keep the bookmark at its running maximum while older gaps are repaired."""
+        if self.coverage_enabled:
+            bookmark = self.get_context_state(context).get("replication_key_value")
+            if bookmark and to_epoch_ms(latest_record["timestamp"]) < to_epoch_ms(
+                parse(bookmark)
+            ):
+                return
+        super()._increment_stream_state(latest_record, context=context)
+
+    def request_records(self, context: dict | None) -> Iterable[dict]:
+        if self.coverage_enabled:
+            yield from self.request_gap_records(context)
+            return
+
+        since_ms = to_epoch_ms(self.get_starting_timestamp(context))
+
+        # Range windows share their boundaries, so skip points already emitted.
+        for response in self.fetch_partition_responses(context):
+            result = response.json()
 
-            if last_timestamp is None or entry["timestamp"] >= last_timestamp:
-                yield entry
+            assert (
+                "error" not in result.keys()
+            ), f"response returned an error for coin {context['id']}"
+
+            for record in market_chart_records(result, context["id"], since_ms):
+                since_ms = to_epoch_ms(record["timestamp"]) + 1
+                yield record
+
+    @property
+    def columnar_batches(self) -> bool:
+        return not self.coverage_enabled
+
+    def partition_columns(self, context: dict) -> dict[str, list]:
+        since_ms = to_epoch_ms(self.get_starting_timestamp(context))
+        columns: dict[str, list] = {
+            "timestamp": [],
+            "price": [],
+            "market_cap": [],
+            "volume": [],
+        }
+        for response in self.fetch_partition_responses(context):
+            result = response.json()
+            assert (
+                "error" not in result.keys()
+            ), f"response returned an error for coin {context['id']}"
+
+            window = market_chart_columns(result, since_ms)
+            for name, values in window.items():
+                columns[name].extend(values)
+            if window["timestamp"]:
+                since_ms = window["timestamp"][-1] + 1
+        columns["id"] = [context["id"]] * len(columns["timestamp"])
+        return columns
 
 
 class CoinHistoricalDataChartByIdStream5m(CoinHistoricalDataChartByIdStream):
@@ -573,7 +945,9 @@ class CoinOHLCChartByIdStream(DynamicIDCoingeckoStream):
     replication_key = "timestamp"
     primary_keys = ["timestamp", "id"]
     is_sorted = True
+    trusted_schema = True
     is_timestamp_replication_key = True
+    columnar_batches = True
 
     schema = th.PropertiesList(
         th.Property("timestamp", th.DateTimeType),
@@ -584,6 +958,11 @@ class CoinOHLCChartByIdStream(DynamicIDCoingeckoStream):
         th.Property("close", th.NumberType),
     ).to_dict()
 
+    @property
+    def data_interval(self) -> str | None:
+        # Automatic granularity is 30-minute candles for the most recent days.
+        return self.stream_params.get("interval") or "30m"
+
     def get_url(self, context: dict | None) -> str:
         state = self.get_context_state(context)
         starting_date = self.get_starting_timestamp(context)
@@ -621,37 +1000,33 @@ class CoinOHLCChartByIdStream(DynamicIDCoingeckoStream):
 
         return url
 
-    def parse_response(self, response):
+    def parse_response(self, response, context: dict | None = None):
         result = response.json()
         assert isinstance(
             result, list
         ), f"response returned an error for coin {context['id']}"
 
-        [r.append(self.ticker) for r in result]
-
-        keys = ["timestamp", "open", "high", "low", "close", "id"]
-        data = [dict(zip(keys, values)) for values in result]
-        data = [
-            {**entry, "timestamp": datetime.utcfromtimestamp(entry["timestamp"] / 1000)}
-            for entry in data
-        ]
-
-        return data
+        return ohlc_records(
+            result,
+            context["id"],
+            to_epoch_ms(self.get_starting_timestamp(context)),
+            self.vectorized_decode,
+        )
 
     def request_records(self, context: dict | None) -> Iterable[dict]:
-        url = self.get_url(context)
-        response = requests.get(
-            url, headers={"x-cg-pro-api-key": self.config.get("api_key")}
-        )
+        yield from self.parse_response(self.fetch_partition(context), context)
 
-        result = self.parse_response(response)
+    def partition_columns(self, context: dict) -> dict[str, list]:
+        result = self.fetch_partition(context).json()
+        assert isinstance(
+            result, list
+        ), f"response returned an error for coin {context['id']}"
 
-        latest_replication_timestamp = datetime.strptime(
-            self.get_starting_replication_key_value(context), "%Y-%m-%dT%H:%M:%S%z"
-        ).replace(tzinfo=None)
-        for record in result:
-            if record["timestamp"] >= latest_replication_timestamp:
-                yield record
+        columns = ohlc_columns(
+            result, to_epoch_ms(self.get_starting_timestamp(context))
+        )
+        columns["id"] = [context["id"]] * len(columns["timestamp"])
+        return columns
 
 
 class CoinCirculatingSupplyChartByIdStream(DynamicIDCoingeckoStream):
@@ -662,6 +1037,7 @@ class CoinCirculatingSupplyChartByIdStream(DynamicIDCoingeckoStream):
     replication_key = "timestamp"
     primary_keys = ["id", "timestamp", "circulating_supply"]
     is_sorted = True
+    trusted_schema = True
     is_timestamp_replication_key = True
 
     schema = th.PropertiesList(
@@ -670,6 +1046,11 @@ class CoinCirculatingSupplyChartByIdStream(DynamicIDCoingeckoStream):
         th.Property("circulating_supply", th.NumberType),
     ).to_dict()
 
+    @property
+    def data_interval(self) -> str | None:
+        # Automatic granularity is 5-minutely for the most recent day.
+        return self.stream_params.get("interval") or "5m"
+
     def raise_coingecko_non_enterprise_warning(self):
         if self.config.get("subscription_level").lower() != "enterprise":
             raise ValueError(
@@ -738,29 +1119,15 @@ class CoinCirculatingSupplyChartByIdStream(DynamicIDCoingeckoStream):
         return url
 
     def request_records(self, context: dict | None) -> Iterable[dict]:
-        url = self.get_url(context)
-        response = requests.get(
-            url, headers={"x-cg-pro-api-key": self.config.get("api_key")}
-        )
-
-        result = response.json()
+        result = self.fetch_partition(context).json()
 
         assert (
             isinstance(result, dict) and "error" not in result
         ), f"response returned an error for coin {context['id']}"
 
-        cleaned_result = [
-            {
-                "id": context.get("id"),
-                "timestamp": datetime.fromtimestamp(item[0] / 1000),
-                "circulating_supply": float(item[1]),
-            }
-            for item in result["circulating_supply"]
-        ]
-
-        latest_replication_timestamp = self.get_starting_replication_key_value(context)
-        latest_replication_timestamp = parse(latest_replication_timestamp).replace(tzinfo=None)
-
-        for record in cleaned_result:
-            if record["timestamp"] >= latest_replication_timestamp:
-                yield record
+        yield from circulating_supply_records(
+            result,
+            context["id"],
+            to_epoch_ms(self.get_starting_timestamp(context)),
+            self.vectorized_decode,
+        )
@@ -2,25 +2,44 @@
 
 from __future__ import annotations
 
+import signal
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import cached_property
+
+import requests
+from requests.adapters import HTTPAdapter
 from singer_sdk import Tap
 from singer_sdk import typing as th
+from singer_sdk.streams.rest import DEFAULT_REQUEST_TIMEOUT
 
-from tap_coingecko.streams import *
+from tap_coingecko.archive import ResponseArchive
+from tap_coingecko.coin_list import CoinListCache
+from tap_coingecko.freshness import next_poll_at
+from tap_coingecko.instrumentation import RunMetrics
+from tap_coingecko.rate_limit import TokenBucket
+from tap_coingecko.response_cache import ResponseCache
+from tap_coingecko.shared_fetch import SharedPayloads
 
+# Stream classes by name, imported from `tap_coingecko.streams` on discovery so
+# `--about` does not build every schema.
 STREAMS = [
-    CoinListStream,
-    SupportedCurrenciesStream,
-    TopGainersLosersStream,
-    RecentlyAddedCoinsStream,
-    CoinsListWithMarketDataStream,
-    CoinDataByIdStream,
-    CoinTickersByIdStream,
-    CoinHistoricalDataByIdStream,
-    CoinHistoricalDataChartByIdStreamDaily,
-    CoinHistoricalDataChartByIdStreamHourly,
-    CoinHistoricalDataChartByIdStream5m,
-    CoinOHLCChartByIdStream,
-    CoinCirculatingSupplyChartByIdStream,
+    "CoinListStream",
+    "SupportedCurrenciesStream",
+    "TopGainersLosersStream",
+    "RecentlyAddedCoinsStream",
+    "CoinsListWithMarketDataStream",
+    "CoinMarketsByIdsStream",
+    "SimplePriceStream",
+    "CoinDataByIdStream",
+    "CoinTickersByIdStream",
+    "CoinHistoricalDataByIdStream",
+    "CoinHistoricalDataChartByIdStreamDaily",
+    "CoinHistoricalDataChartByIdStreamHourly",
+    "CoinHistoricalDataChartByIdStream5m",
+    "CoinOHLCChartByIdStream",
+    "CoinCirculatingSupplyChartByIdStream",
 ]
 
 
@@ -49,15 +68,383 @@ class TapCoingecko(Tap):
             th.DateTimeType,
             description="The earliest record date to sync",
         ),
+        th.Property(
+            "pool_maxsize",
+            th.IntegerType,
+            default=10,
+            description=(
+                "Number of keep-alive connections kept in the HTTP pool shared by "
+                "all streams. Raised to `max_workers` when that is larger."
+            ),
+        ),
+        th.Property(
+            "max_workers",
+            th.IntegerType,
+            default=1,
+            description=(
+                "Number of threads fetching partitions of the id based streams "
+                "concurrently. Records and state are still written by one thread."
+            ),
+        ),
+        th.Property(
+            "request_engine",
+            th.StringType,
+            default="threads",
+            allowed_values=["threads", "asyncio"],
+            description=(
+                "How the id based streams fetch partitions ahead of time: a pool of "
+                "`max_workers` threads, or one asyncio event loop keeping up to "
+                "`max_concurrency` requests in flight (requires the asyncio extra)."
+            ),
+        ),
+        th.Property(
+            "max_concurrency",
+            th.IntegerType,
+            default=100,
+            description="Maximum in-flight requests for the asyncio request engine.",
+        ),
+        th.Property(
+            "subscription_level",
+            th.StringType,
+            description=(
+                "CoinGecko API plan (demo, analyst, lite, pro or enterprise). Sets "
+                "the default request rate and the endpoints and intervals allowed."
+            ),
+        ),
+        th.Property(
+            "rate_limit_per_minute",
+            th.NumberType,
+            description=(
+                "Requests per minute shared by all streams. Defaults to the limit of "
+                "`subscription_level`."
+            ),
+        ),
+        th.Property(
+            "rate_limit_burst",
+            th.IntegerType,
+            description=(
+                "Requests that may be sent back to back before the rate limit "
+                "applies. Defaults to ten seconds worth of requests."
+            ),
+        ),
+        th.Property(
+            "coin_list_cache_ttl",
+            th.IntegerType,
+            default=3600,
+            description=(
+                "Seconds a downloaded `/coins/list` is reused from disk by later "
+                "runs. 0 keeps it in memory for the current run only."
+            ),
+        ),
+        th.Property(
+            "coin_list_cache_dir",
+            th.StringType,
+            description=(
+                "Directory of the coin list cache. Defaults to a tap-coingecko "
+                "folder in the system temp directory."
+            ),
+        ),
+        th.Property(
+            "vectorized_decode",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Decode OHLC and circulating supply arrays with NumPy. "
+                "Requires the `vectorized` extra."
+            ),
+        ),
+        th.Property(
+            "streaming_decode",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Parse coin_data_by_id responses incrementally to keep memory "
+                "flat on large ticker lists. "
+                "Requires the `streaming` extra."
+            ),
+        ),
+        th.Property(
+            "skip_current_partitions",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Skip chart, OHLC and circulating supply coins whose bookmark "
+                "shows no newer point can be published yet, given the series "
+                "interval and CoinGecko's 00:35 UTC daily close."
+            ),
+        ),
+        th.Property(
+            "track_coverage",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Keep an index of the time ranges synced per coin in state and "
+                "request only the missing ranges of the market chart streams. "
+                "Enterprise plans only, as it relies on /market_chart/range "
+                "with an explicit interval."
+            ),
+        ),
+        th.Property(
+            "response_cache",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Cache API responses on disk until CoinGecko refreshes them, so "
+                "retried or overlapping runs do not download them again."
+            ),
+        ),
+        th.Property(
+            "response_cache_dir",
+            th.StringType,
+            description=(
+                "Directory of the response cache. Defaults to a tap-coingecko "
+                "folder in the system temp directory."
+            ),
+        ),
+        th.Property(
+            "response_cache_max_mb",
+            th.IntegerType,
+            default=1024,
+            description=(
+                "Size limit of the response cache. The least recently used "
+                "responses are evicted first."
+            ),
+        ),
+        th.Property(
+            "archive_mode",
+            th.StringType,
+            allowed_values=["record", "replay"],
+            description=(
+                "`record` appends every response the streams parse to a "
+                "compressed archive in `archive_dir`, indexed by stream, coin and "
+                "time window. `replay` re-runs the selected streams against that "
+                "archive instead of the API, once per recorded sync, to rebuild "
+                "history after a schema or parsing change."
+            ),
+        ),
+        th.Property(
+            "archive_dir",
+            th.StringType,
+            description="Directory of the response archive, required by `archive_mode`.",
+        ),
+        th.Property(
+            "shard_index",
+            th.IntegerType,
+            default=0,
+            description=(
+                "Shard synced by this process, from 0 to `shard_count` - 1. Every "
+                "shard runs with the same config otherwise."
+            ),
+        ),
+        th.Property(
+            "shard_count",
+            th.IntegerType,
+            default=1,
+            description=(
+                "Number of processes the coins of the id based streams are split "
+                "between, by a stable hash of the coin id. The plan rate limit is "
+                "split between them too. Merge their state files with "
+                "`tap-coingecko-merge-state`."
+            ),
+        ),
+        th.Property(
+            "poll_interval",
+            th.IntegerType,
+            description=(
+                "Run with `tap-coingecko-poll` to keep the tap running after the "
+                "sync and re-sync the selected snapshot streams "
+                "(top_gainers_losers, recently_added_coins and "
+                "coins_list_with_market_data) every this many seconds, reusing "
+                "its connections. Polls are aligned to multiples of the "
+                "interval, so 300 follows CoinGecko's 5-minute cache. Stops on "
+                "SIGTERM or SIGINT."
+            ),
+        ),
+        th.Property(
+            "poll_offset",
+            th.IntegerType,
+            default=10,
+            description=(
+                "Seconds after each `poll_interval` boundary to poll, giving "
+                "CoinGecko time to refresh its cache."
+            ),
+        ),
+        th.Property(
+            "fast_emit",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Write the records of the chart, OHLC and circulating supply "
+                "streams with orjson and buffered stdout writes, skipping the "
+                "SDK's per-record type conforming, which their decoders make "
+                "unnecessary (requires the fast extra). Off with stream maps or "
+                "flattening."
+            ),
+        ),
+        th.Property(
+            "timing_metrics",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Write METRIC messages with the latency, size, status and retries "
+                "of each HTTP call, the fetch, decode and emit time of each "
+                "partition and the totals of each stream."
+            ),
+        ),
+        th.Property(
+            "timing_summary_path",
+            th.StringType,
+            description=(
+                "File the per-stream timing totals are written to, rewritten "
+                "after each stream. A path ending in `.prom` gets a Prometheus "
+                "textfile, anything else JSON."
+            ),
+        ),
     ).to_dict()
 
+    @cached_property
+    def requests_session(self) -> requests.Session:
+        """Return one keep-alive session reused by every stream and partition."""
+        session = requests.Session()
+        pool_maxsize = max(
+            self.config.get("pool_maxsize", 10), self.config.get("max_workers", 1)
+        )
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @cached_property
+    def request_executor(self) -> Executor | None:
+        """Return the thread pool or asyncio engine every prefetcher submits to."""
+        if self.config.get("request_engine") == "asyncio":
+            from tap_coingecko.aio import AsyncioEngine
+
+            return AsyncioEngine(
+                self.config.get("max_concurrency", 100),
+                timeout=DEFAULT_REQUEST_TIMEOUT,
+                rate_limiter=self.rate_limiter,
+                response_cache=self.response_cache,
+            )
+
+        max_workers = self.config.get("max_workers", 1)
+        if max_workers > 1:
+            return ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="tap-coingecko-fetch"
+            )
+        return None
+
+    @cached_property
+    def coin_list_cache(self) -> CoinListCache:
+        """Return the coin list cache shared by the coin list and `ids: "*"` streams."""
+        return CoinListCache(
+            self.config.get("coin_list_cache_dir"),
+            ttl=self.config.get("coin_list_cache_ttl", 3600),
+        )
+
+    @cached_property
+    def rate_limiter(self) -> TokenBucket:
+        """Return the token bucket every HTTP call of the tap draws from."""
+        return TokenBucket.from_config(self.config)
+
+    @cached_property
+    def response_cache(self) -> ResponseCache | None:
+        """Return the on-disk response cache, if enabled."""
+        if not self.config.get("response_cache", False):
+            return None
+        return ResponseCache(
+            self.config.get("response_cache_dir"),
+            max_bytes=self.config.get("response_cache_max_mb", 1024) * 1024 * 1024,
+        )
+
+    @cached_property
+    def response_archive(self) -> ResponseArchive | None:
+        """Return the archive responses are recorded to or replayed from, if enabled."""
+        if not self.config.get("archive_mode"):
+            return None
+        assert self.config.get("archive_dir"), "archive_mode requires archive_dir"
+        return ResponseArchive(self.config["archive_dir"])
+
+    @cached_property
+    def shared_payloads(self) -> SharedPayloads:
+        """Return the store of payloads one stream hands to a later one."""
+        return SharedPayloads()
+
+    @cached_property
+    def run_metrics(self) -> RunMetrics | None:
+        """Return the timing collector, if `timing_metrics` or a summary is enabled."""
+        timing_metrics = self.config.get("timing_metrics", False)
+        summary_path = self.config.get("timing_summary_path")
+        if not timing_metrics and not summary_path:
+            return None
+        return RunMetrics(
+            self.metrics_logger if timing_metrics else None, summary_path=summary_path
+        )
+
+    @cached_property
+    def stop_polling(self) -> threading.Event:
+        """Return the event that ends `poll_snapshot_streams`."""
+        return threading.Event()
+
+    def poll_snapshot_streams(self) -> None:
+        """Re-sync the selected snapshot streams on schedule until stopped.
+
+        Run by `tap-coingecko-poll` after the initial sync.
+        """
+        assert self.config.get("poll_interval"), "Polling needs poll_interval."
+        streams = [
+            stream
+            for stream in self.streams.values()
+            if stream.selected and stream.pollable
+        ]
+        assert streams, "poll_interval is set but no snapshot stream is selected."
+        interval = self.config["poll_interval"]
+        offset = self.config.get("poll_offset", 10)
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stop_polling.set())
+        try:
+            while not self.stop_polling.wait(
+                next_poll_at(time.time(), interval, offset) - time.time()
+            ):
+                started = time.perf_counter()
+                for stream in streams:
+                    stream.sync()
+                    stream.finalize_state_progress_markers()
+                self.logger.info(
+                    "Polled %d streams in %.3fs.",
+                    len(streams),
+                    time.perf_counter() - started,
+                )
+        except KeyboardInterrupt:
+            pass
+
+    def is_deselected(self, stream_name: str) -> bool:
+        """Whether the input catalog has an entry for the stream that is not selected."""
+        if not self.input_catalog:
+            return False
+        entry = self.input_catalog.get_stream(stream_name)
+        return entry is not None and not entry.metadata.resolve_selection().get(
+            (), True
+        )
+
     def discover_streams(self) -> list[Stream]:
         """Return a list of discovered streams.
 
+        With an input catalog only the selected streams are built, so runs of a
+        single stream do not set up the others.
+
         Returns:
             A list of discovered streams.
         """
-        return [stream(tap=self) for stream in STREAMS]
+        from tap_coingecko import streams
+
+        stream_types = [getattr(streams, name) for name in STREAMS]
+        return [
+            stream_type(tap=self)
+            for stream_type in stream_types
+            if not self.is_deselected(stream_type.name)
+        ]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,268 @@
+"""Throughput benchmark of every stream against the local mock API.
+
+Run from the repository root:
+
+    python -m tests.benchmark --coins 500 --latency 0.02 --config '{"max_workers": 8}'
+
+Each stream is synced in a fresh process, so peak RSS is per stream. The report
+lists requests/s, records/s, peak RSS and time to first record, and can be
+saved with `--json` and compared against an earlier report with `--baseline`,
+which exits non-zero when a stream's records/s fell more than `--tolerance`
+below it. The comparison is meant for reports taken on the same machine, so it
+is not run as part of the test suite.
+The emit path of the time-series streams is tracked by comparing reports with
+and without `fast_emit`:
+
+    python -m tests.benchmark --streams coin_historical_data_chart_by_id_5m \
+        coin_ohlc_chart_by_id --config '{"fast_emit": true}'
+
+`--decode POINTS` instead times the plain and NumPy decoding paths on that many
+synthetic points, without the mock API:
+
+    python -m tests.benchmark --decode 300000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+
+from tests.mock_server import MockCoingecko, MockSettings
+
+IDS = "bitcoin,ethereum,usd-coin"
+
+STREAM_PARAMS = {
+    "coin_list": {"include_platform": "true"},
+    "supported_currencies": {},
+    "top_gainers_losers": {"vs_currency": "usd"},
+    "recently_added_coins": {},
+    "coins_list_with_market_data": {"vs_currency": "usd"},
+    "coin_markets_by_ids": {"ids": "*", "vs_currency": "usd"},
+    "simple_price": {"ids": "*", "vs_currencies": "usd,eur"},
+    "coin_data_by_id": {"ids": IDS, "tickers": "true"},
+    "coin_tickers_by_id": {"ids": IDS},
+    "coin_historical_data_by_id": {"id": "bitcoin", "date": "30-01-2019"},
+    "coin_historical_data_chart_by_id_daily": {
+        "ids": IDS,
+        "vs_currency": "usd",
+        "days": 1000,
+        "interval": "daily",
+    },
+    "coin_historical_data_chart_by_id_hourly": {
+        "ids": IDS,
+        "vs_currency": "usd",
+        "days": 90,
+        "interval": "hourly",
+    },
+    "coin_historical_data_chart_by_id_5m": {
+        "ids": IDS,
+        "vs_currency": "usd",
+        "days": 10,
+        "interval": "5m",
+    },
+    "coin_ohlc_chart_by_id": {"ids": IDS, "vs_currency": "usd", "days": 1},
+    "coin_circulating_supply_chart_by_id": {"ids": IDS, "days": 1},
+}
+
+
+def base_config(api_url: str) -> dict:
+    return {
+        "api_url": api_url,
+        "api_key": "benchmark",
+        "start_date": "2020-01-01T00:00:00Z",
+        "subscription_level": "enterprise",
+        "rate_limit_per_minute": 1_000_000,
+        "coin_list_cache_ttl": 0,
+        "stream_params": STREAM_PARAMS,
+    }
+
+
+class RecordCounter:
+    """Stand-in for stdout that counts RECORD messages instead of writing them.
+
+    Also stands in for `stdout.buffer`, which `fast_emit` writes bytes to.
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.first_record_at: float | None = None
+        self.buffer = self
+
+    def write(self, text: str | bytes) -> int:
+        if isinstance(text, bytes):
+            text = text.decode()
+        records = text.count('"type":"RECORD"') + text.count('"type": "RECORD"')
+        if records and self.first_record_at is None:
+            self.first_record_at = time.perf_counter()
+        self.records += records
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def sync_stream(config: dict, stream_name: str, results) -> None:
+    """Sync one stream, then report its counters through `results`."""
+    import logging
+
+    from tap_coingecko.tap import TapCoingecko
+
+    logging.disable(logging.INFO)
+    counter = RecordCounter()
+    stdout, sys.stdout = sys.stdout, counter
+    try:
+        started_at = time.perf_counter()
+        tap = TapCoingecko(config=config, parse_env_config=False)
+        tap.streams[stream_name].sync()
+        finished_at = time.perf_counter()
+    finally:
+        sys.stdout = stdout
+
+    results.put(
+        {
+            "records": counter.records,
+            "seconds": finished_at - started_at,
+            "time_to_first_record": (
+                None
+                if counter.first_record_at is None
+                else counter.first_record_at - started_at
+            ),
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+    )
+
+
+def run_benchmark(
+    settings: MockSettings, streams: list[str], overrides: dict
+) -> dict[str, dict]:
+    """Return the measurements of each stream, synced one after another."""
+    context = multiprocessing.get_context("spawn")
+    report = {}
+    with MockCoingecko(settings) as server:
+        config = {**base_config(server.api_url), **overrides}
+        for stream_name in streams:
+            results = context.Queue()
+            requests_before = settings.requests
+            process = context.Process(
+                target=sync_stream, args=(config, stream_name, results)
+            )
+            process.start()
+            measurement = results.get()
+            process.join()
+
+            requests = settings.requests - requests_before
+            seconds = measurement["seconds"]
+            report[stream_name] = {
+                **measurement,
+                "requests": requests,
+                "requests_per_second": requests / seconds,
+                "records_per_second": measurement["records"] / seconds,
+            }
+    return report
+
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return the streams whose records/s fell more than `tolerance` below baseline."""
+    slower = []
+    for stream_name, measurement in report.items():
+        expected = baseline.get(stream_name, {}).get("records_per_second")
+        if expected and measurement["records_per_second"] < expected * (1 - tolerance):
+            slower.append(
+                f"{stream_name}: {measurement['records_per_second']:.0f} records/s, "
+                f"baseline {expected:.0f}"
+            )
+    return slower
+
+
+def decode_timings(points: int, runs: int = 5) -> dict[str, dict[str, float]]:
+    """Return the best-of-`runs` decode seconds per decoder and path."""
+    from tap_coingecko.decode import circulating_supply_records, ohlc_records
+
+    times = [1_600_000_000_000 + i * 300_000 for i in range(points)]
+    decoders = {
+        "ohlc": (ohlc_records, [[ms, 1.0, 2.0, 0.5, 1.5] for ms in times]),
+        "circulating_supply": (
+            circulating_supply_records,
+            {"circulating_supply": [[ms, "19000000.0"] for ms in times]},
+        ),
+    }
+    timings = {}
+    for name, (decode, result) in decoders.items():
+        timings[name] = {}
+        for path, vectorized in (("plain", False), ("vectorized", True)):
+            best = float("inf")
+            for _ in range(runs):
+                started_at = time.perf_counter()
+                for _ in decode(result, "bitcoin", None, vectorized):
+                    pass
+                best = min(best, time.perf_counter() - started_at)
+            timings[name][path] = best
+    return timings
+
+
+def print_report(report: dict) -> None:
+    header = (
+        f"{'stream':<42}{'requests':>9}{'req/s':>9}{'records':>10}"
+        f"{'rec/s':>11}{'first rec':>11}{'rss MB':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for stream_name, m in report.items():
+        first = m["time_to_first_record"]
+        print(
+            f"{stream_name:<42}{m['requests']:>9}{m['requests_per_second']:>9.1f}"
+            f"{m['records']:>10}{m['records_per_second']:>11.0f}"
+            f"{'-' if first is None else f'{first:.3f}s':>11}"
+            f"{m['peak_rss_mb']:>9.1f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", nargs="*", default=list(STREAM_PARAMS))
+    parser.add_argument("--coins", type=int, default=100)
+    parser.add_argument("--tickers", type=int, default=150)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--config", type=json.loads, default={})
+    parser.add_argument("--json", help="Write the report to this file.")
+    parser.add_argument("--baseline", help="Compare against an earlier report.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--decode", type=int, metavar="POINTS")
+    args = parser.parse_args(argv)
+
+    if args.decode:
+        for name, paths in decode_timings(args.decode).items():
+            print(
+                f"{name:<20}plain {paths['plain']:.3f}s"
+                f"  vectorized {paths['vectorized']:.3f}s"
+            )
+        return 0
+
+    settings = MockSettings(
+        latency=args.latency,
+        fail_every=args.fail_every,
+        coins=args.coins,
+        tickers_per_coin=args.tickers,
+    )
+    report = run_benchmark(settings, args.streams, args.config)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(report, json.load(f), args.tolerance)
+        for line in slower:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
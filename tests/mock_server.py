@@ -0,0 +1,281 @@
+"""Local stand-in for the CoinGecko API, serving the recorded fixtures.
+
+Every endpoint the tap calls is answered from `fixtures/coingecko.json`, scaled
+to the requested ids, pages and time ranges, so streams can be synced and
+benchmarked without network access or credentials.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+import typing as t
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = json.loads(
+    (Path(__file__).parent / "fixtures" / "coingecko.json").read_text()
+)
+
+DAY_MS = 86_400_000
+STEP_MS = {"5m": 300_000, "hourly": 3_600_000, "daily": DAY_MS}
+
+
+@dataclass
+class MockSettings:
+    """Knobs of the mock server.
+
+    `latency` is added to every response in seconds. Every `fail_every`-th
+    request is answered with a 429 and `retry_after`. The first `drops`
+    requests of every url are dropped without an answer. `coins` is the length of
+    the coin list and `tickers_per_coin` sizes the ticker payloads.
+    """
+
+    latency: float = 0.0
+    fail_every: int = 0
+    retry_after: int = 0
+    drops: int = 0
+    attempts: dict[str, int] = field(default_factory=dict, repr=False)
+    coins: int = 100
+    tickers_per_coin: int = 150
+    requests: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+def auto_step(span_ms: float) -> int:
+    """Return the point spacing CoinGecko picks for a chart spanning `span_ms`."""
+    if span_ms <= DAY_MS:
+        return STEP_MS["5m"]
+    if span_ms <= 90 * DAY_MS:
+        return STEP_MS["hourly"]
+    return STEP_MS["daily"]
+
+
+def timestamps(start_ms: float, end_ms: float, step_ms: int) -> list[int]:
+    first = int(-(-start_ms // step_ms) * step_ms)
+    return list(range(first, int(end_ms), step_ms))
+
+
+class MockCoingeckoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes, which Nagle would hold back.
+    disable_nagle_algorithm = True
+    settings: MockSettings
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        settings = self.settings
+        with settings.lock:
+            settings.requests += 1
+            request_number = settings.requests
+            attempt = settings.attempts[self.path] = (
+                settings.attempts.get(self.path, 0) + 1
+            )
+        if settings.latency:
+            time.sleep(settings.latency)
+
+        if settings.fail_every and request_number % settings.fail_every == 0:
+            self.send_json(
+                {"status": {"error_code": 429, "error_message": "Rate limited"}},
+                status=429,
+                headers={"Retry-After": str(settings.retry_after)},
+            )
+            return
+
+        if attempt <= settings.drops:
+            self.close_connection = True
+            return
+
+        parts = urlsplit(self.path)
+        path = re.sub(r"^.*/api/v3", "", parts.path)
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        for pattern, route in ROUTES:
+            match = re.fullmatch(pattern, path)
+            if match:
+                route(self, params, *match.groups())
+                return
+        self.send_json({"error": "Not found"}, status=404)
+
+    def send_json(
+        self, body: t.Any, status: int = 200, headers: dict | None = None
+    ) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def coin_ids(self, params: dict) -> list[str]:
+        if params.get("ids"):
+            return params["ids"].split(",")
+        return [coin["id"] for coin in coins_list(self.settings.coins)]
+
+    def coins_list(self, params: dict) -> None:
+        self.send_json(coins_list(self.settings.coins))
+
+    def supported_vs_currencies(self, params: dict) -> None:
+        self.send_json(FIXTURES["supported_vs_currencies"])
+
+    def top_gainers_losers(self, params: dict) -> None:
+        self.send_json(FIXTURES["top_gainers_losers"])
+
+    def coins_list_new(self, params: dict) -> None:
+        self.send_json(FIXTURES["coins_list_new"])
+
+    def coins_markets(self, params: dict) -> None:
+        per_page = min(int(params.get("per_page", 100)), 250)
+        page = int(params.get("page", 1))
+        ids = self.coin_ids(params)[(page - 1) * per_page : page * per_page]
+        self.send_json([{**FIXTURES["coins_markets"], "id": i} for i in ids])
+
+    def simple_price(self, params: dict) -> None:
+        template = FIXTURES["simple_price"]
+        currencies = params.get("vs_currencies", "usd").split(",")
+        body = {}
+        for coin_id in params["ids"].split(","):
+            body[coin_id] = {"last_updated_at": template["last_updated_at"]}
+            for currency in currencies:
+                for key, value in template.items():
+                    if key.startswith("usd"):
+                        body[coin_id][currency + key[3:]] = value
+        self.send_json(body)
+
+    def coin(self, params: dict, coin_id: str) -> None:
+        tickers = FIXTURES["coin"]["tickers"] * self.settings.tickers_per_coin
+        body = {**FIXTURES["coin"], "id": coin_id, "tickers": tickers}
+        for flag in COIN_FLAGS:
+            if params.get(flag) == "false":
+                body.pop(flag, None)
+        self.send_json(body)
+
+    def coin_tickers(self, params: dict, coin_id: str) -> None:
+        total = self.settings.tickers_per_coin
+        page = int(params.get("page", 1))
+        count = max(0, min(100, total - (page - 1) * 100))
+        [ticker] = FIXTURES["coin_tickers"]["tickers"]
+        tickers = [
+            {**ticker, "target": f"T{(page - 1) * 100 + i}"} for i in range(count)
+        ]
+        self.send_json(
+            {"name": coin_id, "tickers": tickers}, headers={"total": str(total)}
+        )
+
+    def coin_history(self, params: dict, coin_id: str) -> None:
+        self.send_json({**FIXTURES["coin_history"], "id": coin_id})
+
+    def market_chart(self, params: dict, coin_id: str) -> None:
+        end_ms = time.time() * 1000
+        days = params.get("days", "1")
+        span_ms = (365 * 5 if days == "max" else float(days)) * DAY_MS
+        step_ms = STEP_MS.get(params.get("interval")) or auto_step(span_ms)
+        self.send_chart(timestamps(end_ms - span_ms, end_ms, step_ms))
+
+    def market_chart_range(self, params: dict, coin_id: str) -> None:
+        start_ms = float(params["from"]) * 1000
+        end_ms = min(float(params["to"]) * 1000, time.time() * 1000)
+        step_ms = STEP_MS.get(params.get("interval")) or auto_step(end_ms - start_ms)
+        self.send_chart(timestamps(start_ms, end_ms, step_ms))
+
+    def send_chart(self, points: list[int]) -> None:
+        template = FIXTURES["market_chart_point"]
+        self.send_json(
+            {
+                "prices": [[ms, template["price"]] for ms in points],
+                "market_caps": [[ms, template["market_cap"]] for ms in points],
+                "total_volumes": [[ms, template["total_volume"]] for ms in points],
+            }
+        )
+
+    def ohlc(self, params: dict, coin_id: str) -> None:
+        end_ms = time.time() * 1000
+        days = params.get("days", "1")
+        span_days = 365 * 5 if days == "max" else float(days)
+        step_ms = 1_800_000 if span_days <= 2 else 4 * 3_600_000
+        if span_days > 30:
+            step_ms = 4 * DAY_MS
+        candle = FIXTURES["ohlc_candle"]
+        points = timestamps(end_ms - span_days * DAY_MS, end_ms, step_ms)
+        self.send_json([[ms, *candle] for ms in points])
+
+    def circulating_supply_chart(self, params: dict, coin_id: str) -> None:
+        end_ms = time.time() * 1000
+        span_ms = float(params.get("days") or 1) * DAY_MS
+        points = timestamps(end_ms - span_ms, end_ms, auto_step(span_ms))
+        supply = FIXTURES["circulating_supply_point"]
+        self.send_json({"circulating_supply": [[ms, supply] for ms in points]})
+
+
+# Query flags of /coins/{id} that leave out the property of the same name.
+COIN_FLAGS = [
+    "localization",
+    "tickers",
+    "market_data",
+    "community_data",
+    "developer_data",
+]
+
+
+def coins_list(count: int) -> list[dict]:
+    coins = FIXTURES["coins_list"][:count]
+    template = FIXTURES["coins_list"][0]
+    for i in range(len(coins), count):
+        coins.append({**template, "id": f"coin-{i}", "symbol": f"c{i}"})
+    return coins
+
+
+ROUTES: list[tuple[str, t.Callable]] = [
+    (r"/coins/list", MockCoingeckoHandler.coins_list),
+    (r"/coins/list/new", MockCoingeckoHandler.coins_list_new),
+    (r"/simple/supported_vs_currencies", MockCoingeckoHandler.supported_vs_currencies),
+    (r"/simple/price", MockCoingeckoHandler.simple_price),
+    (r"/coins/top_gainers_losers", MockCoingeckoHandler.top_gainers_losers),
+    (r"/coins/markets", MockCoingeckoHandler.coins_markets),
+    (r"/coins/([^/]+)/tickers", MockCoingeckoHandler.coin_tickers),
+    (r"/coins/([^/]+)/history", MockCoingeckoHandler.coin_history),
+    (r"/coins/([^/]+)/market_chart", MockCoingeckoHandler.market_chart),
+    (r"/coins/([^/]+)/market_chart/range", MockCoingeckoHandler.market_chart_range),
+    (r"/coins/([^/]+)/ohlc", MockCoingeckoHandler.ohlc),
+    (
+        r"/coins/([^/]+)/circulating_supply_chart",
+        MockCoingeckoHandler.circulating_supply_chart,
+    ),
+    (r"/coins/([^/]+)", MockCoingeckoHandler.coin),
+]
+
+
+class MockCoingecko:
+    """Run the mock API on a free local port in a background thread.
+
+    Usable as a context manager; `api_url` is the value for the tap's
+    `api_url` setting.
+    """
+
+    def __init__(self, settings: MockSettings | None = None, port: int = 0):
+        self.settings = settings or MockSettings()
+        handler = type("Handler", (MockCoingeckoHandler,), {"settings": self.settings})
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="mock-coingecko", daemon=True
+        )
+
+    @property
+    def api_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/api/v3"
+
+    def __enter__(self) -> MockCoingecko:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
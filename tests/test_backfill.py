@@ -0,0 +1,23 @@
+"""Tests for market_chart/range backfill planning."""
+
+from datetime import datetime, timedelta
+
+from tap_coingecko.backfill import plan_windows
+
+START = datetime(2024, 1, 1)
+
+
+def test_windows_fit_the_interval_limit_and_cover_the_range():
+    end = START + timedelta(days=25)
+    windows = plan_windows(START, end, "5m")
+
+    assert windows == [
+        (START, START + timedelta(days=10)),
+        (START + timedelta(days=10), START + timedelta(days=20)),
+        (START + timedelta(days=20), end),
+    ]
+
+
+def test_unlimited_interval_is_one_window():
+    end = START + timedelta(days=3000)
+    assert plan_windows(START, end, "daily") == [(START, end)]
@@ -0,0 +1,147 @@
+"""Tests for batch files written from decoded columns."""
+
+from __future__ import annotations
+
+import copy
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from singer_sdk.helpers._batch import BatchConfig
+
+from tap_coingecko.batch import ColumnBatchWriter, chunk_columns, jsonl_lines
+from tap_coingecko.tap import TapCoingecko
+from tests.benchmark import base_config
+from tests.mock_server import MockCoingecko, MockSettings
+from tests.test_mock_sync import sync_messages
+
+
+def test_jsonl_lines_match_json_dumps():
+    columns = {
+        "timestamp": [1704067200000, 1704070800000],
+        "price": [1.5, None],
+        "id": ["bitcoin", "bitcoin"],
+    }
+    assert [json.loads(line) for line in jsonl_lines(columns)] == [
+        {"timestamp": "2024-01-01T00:00:00+00:00", "price": 1.5, "id": "bitcoin"},
+        {"timestamp": "2024-01-01T01:00:00+00:00", "price": None, "id": "bitcoin"},
+    ]
+    assert [len(c["timestamp"]) for c in chunk_columns(columns, 1)] == [1, 1]
+
+
+def test_unsupported_formats_are_rejected(tmp_path):
+    batch_config = BatchConfig.from_dict(
+        {"encoding": {"format": "jsonl"}, "storage": {"root": f"file://{tmp_path}"}}
+    )
+    # The SDK registers more encodings than the columnar writer supports.
+    batch_config.encoding.format = "csv"
+    writer = ColumnBatchWriter(batch_config, "tap-coingecko", "stream")
+    with pytest.raises(ValueError, match="csv"):
+        writer.write({"timestamp": [1704067200000]})
+
+
+def sync_stream(
+    config: dict, stream_name: str, state: dict | None = None, catalog=None
+) -> list[dict]:
+    tap = TapCoingecko(
+        config=config,
+        state=copy.deepcopy(state),
+        catalog=catalog,
+        parse_env_config=False,
+    )
+    return sync_messages(tap, [stream_name])
+
+
+def batch_rows(messages: list[dict]) -> list[dict]:
+    rows = []
+    for message in messages:
+        assert message["type"] != "RECORD"
+        for url in message.get("manifest", []):
+            with gzip.open(url[len("file://") :], "rt") as f:
+                rows += [json.loads(line) for line in f]
+    return rows
+
+
+BATCH_CONFIG = {
+    "encoding": {"format": "jsonl", "compression": "gzip"},
+    "batch_size": 1000,
+}
+
+
+def test_chart_batches_hold_the_same_records(tmp_path):
+    stream_name = "coin_historical_data_chart_by_id_hourly"
+    with MockCoingecko(MockSettings(coins=20)) as server:
+        config = base_config(server.api_url)
+        records = [
+            message["record"]
+            for message in sync_stream(config, stream_name)
+            if message["type"] == "RECORD"
+        ]
+        config["batch_config"] = {
+            **BATCH_CONFIG,
+            "storage": {"root": f"file://{tmp_path}"},
+        }
+        messages = sync_stream(config, stream_name)
+
+    assert batch_rows(messages) == records
+    assert messages[-1]["type"] == "STATE"
+
+
+def test_chart_batches_start_after_the_bookmark(tmp_path):
+    stream_name = "coin_historical_data_chart_by_id_hourly"
+    # A `days=1` request for this bookmark also returns the hours before it.
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0)
+    bookmark = (today.replace(microsecond=0) - timedelta(minutes=1)).isoformat()
+    state = {
+        "bookmarks": {
+            stream_name: {
+                "partitions": [
+                    {
+                        "context": {"id": "bitcoin"},
+                        "replication_key": "timestamp",
+                        "replication_key_value": bookmark,
+                    }
+                ]
+            }
+        }
+    }
+    with MockCoingecko(MockSettings(coins=20)) as server:
+        config = base_config(server.api_url)
+        records = [
+            message["record"]
+            for message in sync_stream(config, stream_name, state)
+            if message["type"] == "RECORD"
+        ]
+        config["batch_config"] = {
+            **BATCH_CONFIG,
+            "storage": {"root": f"file://{tmp_path}"},
+        }
+        rows = batch_rows(sync_stream(config, stream_name, state))
+
+    assert rows == records
+    bitcoin = [row["timestamp"] for row in rows if row["id"] == "bitcoin"]
+    assert 0 < len(bitcoin) <= 25
+    assert min(bitcoin) >= bookmark
+
+
+def test_chart_batches_leave_out_deselected_columns(tmp_path):
+    stream_name = "coin_historical_data_chart_by_id_hourly"
+    with MockCoingecko(MockSettings(coins=20)) as server:
+        config = {
+            **base_config(server.api_url),
+            "batch_config": {**BATCH_CONFIG, "storage": {"root": f"file://{tmp_path}"}},
+        }
+        catalog = TapCoingecko(config=config, parse_env_config=False).catalog_dict
+        for entry in catalog["streams"]:
+            for metadata in entry["metadata"]:
+                metadata["metadata"]["selected"] = entry[
+                    "tap_stream_id"
+                ] == stream_name and metadata["breadcrumb"] != [
+                    "properties",
+                    "market_cap",
+                ]
+        rows = batch_rows(sync_stream(config, stream_name, catalog=catalog))
+
+    assert rows
+    assert all(set(row) == {"timestamp", "price", "volume", "id"} for row in rows)
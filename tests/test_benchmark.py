@@ -0,0 +1,18 @@
+"""Tests for the benchmark report comparison."""
+
+from tests.benchmark import regressions
+
+
+def test_regressions_are_streams_slower_than_the_tolerance():
+    baseline = {
+        "coin_list": {"records_per_second": 1000.0},
+        "coin_ohlc_chart_by_id": {"records_per_second": 1000.0},
+    }
+    report = {
+        "coin_list": {"records_per_second": 800.0},
+        "coin_ohlc_chart_by_id": {"records_per_second": 700.0},
+        "simple_price": {"records_per_second": 1.0},
+    }
+
+    [slower] = regressions(report, baseline, tolerance=0.25)
+    assert slower.startswith("coin_ohlc_chart_by_id: 700 records/s")
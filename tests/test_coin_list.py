@@ -0,0 +1,26 @@
+"""Tests for the disk-backed coin list cache."""
+
+from tap_coingecko.coin_list import CoinListCache
+
+URL = "https://pro-api.coingecko.com/api/v3/coins/list"
+COINS = [{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}]
+
+
+def test_downloads_once_per_process_and_ttl(tmp_path):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return COINS
+
+    assert CoinListCache(tmp_path, ttl=60).get(URL, fetch) == COINS
+    assert CoinListCache(tmp_path, ttl=60).get(URL, fetch) == COINS
+    assert len(calls) == 1
+
+
+def test_zero_ttl_skips_disk(tmp_path):
+    cache = CoinListCache(tmp_path, ttl=0)
+
+    assert cache.get(URL, lambda: COINS) == COINS
+    assert cache.get(URL, lambda: []) == COINS
+    assert not list(tmp_path.iterdir())
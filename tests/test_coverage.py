@@ -0,0 +1,17 @@
+"""Tests for the per-coin coverage index."""
+
+from tap_coingecko.coverage import add_range, find_gaps, in_gaps, plan_requests
+
+
+def test_ranges_merge_and_gaps_are_what_is_left():
+    covered = add_range([[0, 10], [20, 30]], 10, 15)
+    assert covered == [[0, 15], [20, 30]]
+    assert find_gaps(covered, 5, 40) == [(15, 20), (30, 40)]
+    assert find_gaps(add_range(covered, 12, 25), 0, 30) == []
+
+
+def test_gaps_are_filled_with_the_fewest_requests():
+    gaps = [(0, 10), (20, 30), (100, 250)]
+    assert plan_requests(gaps, None) == [(0, 250)]
+    assert plan_requests(gaps, 100) == [(0, 30), (100, 200), (200, 250)]
+    assert in_gaps(gaps, 25) and not in_gaps(gaps, 50)
@@ -0,0 +1,68 @@
+"""Tests for time-series decoding."""
+
+from datetime import datetime
+
+import pytest
+
+from tap_coingecko.decode import (
+    circulating_supply_records,
+    cutoff_index,
+    market_chart_records,
+    ohlc_records,
+    to_epoch_ms,
+)
+
+HOUR_MS = 3_600_000
+START_MS = to_epoch_ms(datetime(2024, 1, 1))
+
+MARKET_CHART = {
+    "prices": [[START_MS + i * HOUR_MS, 100.0 + i] for i in range(4)],
+    "market_caps": [[START_MS + i * HOUR_MS, 1e9 + i] for i in range(4)],
+    "total_volumes": [[START_MS + i * HOUR_MS, 1e6 + i] for i in range(4)],
+}
+OHLC = [[START_MS + i * HOUR_MS, 1.0, 2.0, 0.5, 1.5] for i in range(4)]
+CIRCULATING_SUPPLY = {
+    "circulating_supply": [[START_MS + i * HOUR_MS, str(1000 + i)] for i in range(4)]
+}
+
+
+def test_market_chart_records_respect_the_cutoff():
+    records = list(market_chart_records(MARKET_CHART, "bitcoin", START_MS + HOUR_MS))
+
+    assert [r["timestamp"] for r in records] == [
+        datetime(2024, 1, 1, 1),
+        datetime(2024, 1, 1, 2),
+        datetime(2024, 1, 1, 3),
+    ]
+    assert records[0] == {
+        "timestamp": datetime(2024, 1, 1, 1),
+        "id": "bitcoin",
+        "price": 101.0,
+        "market_cap": 1e9 + 1,
+        "volume": 1e6 + 1,
+    }
+
+
+def test_cutoff_index_bisects_the_raw_points():
+    points = OHLC
+    assert cutoff_index(None, points) == 0
+    assert cutoff_index(START_MS - 1, points) == 0
+    assert cutoff_index(START_MS + HOUR_MS, points) == 1
+    assert cutoff_index(START_MS + HOUR_MS + 1, points) == 2
+    assert cutoff_index(START_MS + 9 * HOUR_MS, points) == 4
+    # Aligned series are cut at the earliest timestamp of each point.
+    late_prices = [[ms + 1000, value] for ms, value in MARKET_CHART["prices"]]
+    assert cutoff_index(START_MS + HOUR_MS, late_prices, OHLC[:3]) == 1
+    assert cutoff_index(START_MS + 9 * HOUR_MS, late_prices, OHLC[:3]) == 3
+
+
+def test_vectorized_decoding_matches_the_python_path():
+    pytest.importorskip("numpy")
+    for decode, result in (
+        (ohlc_records, OHLC),
+        (circulating_supply_records, CIRCULATING_SUPPLY),
+    ):
+        for since_ms in (None, START_MS + 2 * HOUR_MS):
+            assert list(decode(result, "bitcoin", since_ms, True)) == list(
+                decode(result, "bitcoin", since_ms, False)
+            )
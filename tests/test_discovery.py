@@ -0,0 +1,20 @@
+"""Tests for stream discovery."""
+
+from tap_coingecko.tap import STREAMS, TapCoingecko
+
+CONFIG = {"api_key": "test", "stream_params": {}}
+
+
+def test_discovery_does_not_need_stream_params():
+    tap = TapCoingecko(config=CONFIG, parse_env_config=False)
+    assert len(tap.catalog_dict["streams"]) == len(STREAMS)
+
+
+def test_only_selected_streams_are_built():
+    catalog = TapCoingecko(config=CONFIG, parse_env_config=False).catalog_dict
+    for entry in catalog["streams"]:
+        root = next(m for m in entry["metadata"] if m["breadcrumb"] == [])
+        root["metadata"]["selected"] = entry["tap_stream_id"] == "coin_list"
+
+    tap = TapCoingecko(config=CONFIG, catalog=catalog, parse_env_config=False)
+    assert list(tap.streams) == ["coin_list"]
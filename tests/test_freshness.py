@@ -0,0 +1,27 @@
+"""Tests for time-series publication cadence."""
+
+from datetime import datetime, timezone
+
+from tap_coingecko.freshness import next_data_at, next_poll_at
+
+
+def test_daily_points_are_published_at_the_daily_close():
+    bookmark = datetime(2024, 5, 1, 0, 0)
+    assert next_data_at(bookmark, "daily") == datetime(
+        2024, 5, 2, 0, 35, tzinfo=timezone.utc
+    )
+
+
+def test_intraday_points_follow_the_interval():
+    bookmark = datetime(2024, 5, 1, 12, 7, tzinfo=timezone.utc)
+    assert next_data_at(bookmark, "5m") == datetime(
+        2024, 5, 1, 12, 10, tzinfo=timezone.utc
+    )
+    assert next_data_at(bookmark, "hourly") == datetime(
+        2024, 5, 1, 13, 0, tzinfo=timezone.utc
+    )
+
+
+def test_polls_are_aligned_to_the_interval():
+    assert next_poll_at(1_000_000_000, 300, 10) == 1_000_000_210
+    assert next_poll_at(1_000_000_210, 300, 10) == 1_000_000_510
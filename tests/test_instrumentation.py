@@ -0,0 +1,37 @@
+"""Tests for the timing summary."""
+
+import json
+
+import requests
+
+from tap_coingecko.instrumentation import RunMetrics
+from tests.test_mock_sync import sync_all
+from tests.mock_server import MockSettings
+
+
+def test_sync_writes_a_summary_per_stream(tmp_path):
+    path = tmp_path / "timings.json"
+    settings = MockSettings(coins=20, fail_every=10)
+    counts = sync_all(settings, timing_summary_path=str(path))
+
+    summary = json.loads(path.read_text())
+    assert {name: totals["records"] for name, totals in summary.items()} == counts
+    retries = sum(totals["retries"] for totals in summary.values())
+    requests_made = sum(totals["requests"] for totals in summary.values())
+    assert retries > 0
+    assert requests_made + retries == settings.requests
+    assert summary["coin_tickers_by_id"]["partitions"] == 3
+    assert all(totals["sync_seconds"] > 0 for totals in summary.values())
+
+
+def test_prometheus_textfile(tmp_path):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b"[]"
+    run_metrics = RunMetrics(summary_path=str(tmp_path / "tap.prom"))
+    run_metrics.observe_request("coin_list", "http://api/coins/list", response, 0.5)
+    run_metrics.observe_stream("coin_list", 1.0)
+
+    text = (tmp_path / "tap.prom").read_text()
+    assert 'tap_coingecko_bytes_total{stream="coin_list"} 2' in text
+    assert 'tap_coingecko_responses_total{stream="coin_list",status="200"} 1' in text
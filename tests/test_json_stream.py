@@ -0,0 +1,59 @@
+"""Tests for incremental JSON decoding."""
+
+import gc
+import json
+import weakref
+
+import pytest
+
+from tap_coingecko.archive import json_response
+from tap_coingecko.json_stream import stream_record
+from tap_coingecko.tap import TapCoingecko
+from tests.benchmark import base_config
+
+pytest.importorskip("ijson")
+
+COIN = {
+    "id": "bitcoin",
+    "market_data": {"current_price": {"usd": 64000.5}},
+    "tickers": [
+        {"base": "BTC", "target": "USDT", "last": 64001.25, "is_stale": False},
+        {"base": "BTC", "target": "EUR", "last": 59000, "trust_score": None},
+    ],
+}
+
+
+def test_stream_record_matches_json_loads():
+    assert stream_record(json.dumps(COIN).encode()) == COIN
+
+
+def test_stringified_arrays_match_str_of_the_parsed_list():
+    record = stream_record(json.dumps(COIN).encode(), {"tickers"})
+
+    assert record["tickers"] == str(COIN["tickers"])
+    assert record["market_data"] == COIN["market_data"]
+
+
+def test_dropped_keys_are_skipped():
+    record = stream_record(json.dumps(COIN).encode(), {"tickers"}, {"market_data"})
+
+    assert record == {"id": "bitcoin", "tickers": str(COIN["tickers"])}
+
+
+def test_coin_data_responses_are_released_before_the_record_is_consumed():
+    tap = TapCoingecko(config=base_config("http://localhost"), parse_env_config=False)
+    stream = tap.streams["coin_data_by_id"]
+    responses = []
+
+    def fetch_partition(context):
+        response = json_response("http://api/coins/bitcoin", COIN)
+        responses.append(weakref.ref(response))
+        return response
+
+    stream.fetch_partition = fetch_partition
+    records = stream.request_records({"id": "bitcoin"})
+    record = next(records)
+    gc.collect()
+
+    assert record["tickers"] == str(COIN["tickers"])
+    assert responses[0]() is None
@@ -0,0 +1,338 @@
+"""Sync every stream against the local mock API, without network access."""
+
+from __future__ import annotations
+
+import copy
+import io
+import json
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tap_coingecko.tap import TapCoingecko
+from tests.benchmark import STREAM_PARAMS, base_config
+from tests.mock_server import MockCoingecko, MockSettings
+
+
+def sync_messages(tap: TapCoingecko, streams: list[str] | None = None) -> list[dict]:
+    """Sync `streams` of `tap`, all of them by default, and return their messages.
+
+    Stdout is captured through a byte buffer, which `fast_emit` writes to.
+    """
+    stdout = io.TextIOWrapper(io.BytesIO())
+    with redirect_stdout(stdout):
+        for name in tap.streams if streams is None else streams:
+            tap.streams[name].sync()
+    stdout.flush()
+    return [json.loads(line) for line in stdout.buffer.getvalue().splitlines()]
+
+
+def sync_all(settings: MockSettings, **overrides) -> dict[str, int]:
+    with MockCoingecko(settings) as server:
+        config = {**base_config(server.api_url), **overrides}
+        messages = sync_messages(TapCoingecko(config=config, parse_env_config=False))
+
+    counts = dict.fromkeys(STREAM_PARAMS, 0)
+    for message in messages:
+        if message["type"] == "RECORD":
+            counts[message["stream"]] += 1
+    return counts
+
+
+@pytest.mark.parametrize(
+    "overrides", [{}, {"max_workers": 4}, {"request_engine": "asyncio"}]
+)
+def test_every_stream_syncs_against_the_mock_api(overrides):
+    if overrides.get("request_engine") == "asyncio":
+        pytest.importorskip("aiohttp")
+    counts = sync_all(MockSettings(coins=300, tickers_per_coin=120), **overrides)
+
+    assert all(counts.values()), counts
+    assert counts["coin_list"] == 300
+    assert counts["coins_list_with_market_data"] == 300
+    assert counts["coin_tickers_by_id"] == 3 * 120
+
+
+def test_market_pages_stop_at_the_first_short_page():
+    stream_name = "coins_list_with_market_data"
+    settings = MockSettings(coins=600)
+    with MockCoingecko(settings) as server:
+        config = {
+            **base_config(server.api_url),
+            "max_workers": 4,
+            "stream_params": {
+                **STREAM_PARAMS,
+                stream_name: {"vs_currency": "usd", "per_page": 1000},
+            },
+        }
+        tap = TapCoingecko(config=config, parse_env_config=False)
+        messages = sync_messages(tap, [stream_name])
+
+    ids = [m["record"]["id"] for m in messages if m["type"] == "RECORD"]
+    assert len(ids) == len(set(ids)) == 600
+    pages = [path for path in settings.attempts if "/coins/markets?" in path]
+    assert 3 <= len(pages) <= 3 + 4 * 2
+
+
+@pytest.mark.parametrize(
+    "overrides", [{"max_workers": 4}, {"request_engine": "asyncio"}]
+)
+def test_ticker_pages_share_the_tap_request_executor(overrides):
+    if overrides.get("request_engine") == "asyncio":
+        pytest.importorskip("aiohttp")
+    stream_name = "coin_tickers_by_id"
+    with MockCoingecko(MockSettings(tickers_per_coin=350)) as server:
+        config = {**base_config(server.api_url), **overrides}
+        tap = TapCoingecko(config=config, parse_env_config=False)
+        before = set(threading.enumerate())
+        messages = sync_messages(tap, [stream_name])
+        started = [
+            thread.name
+            for thread in set(threading.enumerate()) - before
+            if thread.name.startswith("tap-coingecko")
+        ]
+
+    assert sum(m["type"] == "RECORD" for m in messages) == 3 * 350
+    if "max_workers" in overrides:
+        assert tap.request_executor._max_workers == 4
+        assert len(started) <= 4
+    else:
+        assert started == ["tap-coingecko-asyncio"]
+
+
+@pytest.mark.parametrize("overrides", [{}, {"max_workers": 4}])
+def test_batched_ids_are_each_emitted_once(overrides):
+    settings = MockSettings(coins=1100)
+    with MockCoingecko(settings) as server:
+        config = {**base_config(server.api_url), **overrides}
+        tap = TapCoingecko(config=config, parse_env_config=False)
+        messages = sync_messages(tap, ["coin_markets_by_ids", "simple_price"])
+
+    records = [m for m in messages if m["type"] == "RECORD"]
+    markets = [
+        m["record"]["id"] for m in records if m["stream"] == "coin_markets_by_ids"
+    ]
+    prices = [
+        (m["record"]["id"], m["record"]["vs_currency"])
+        for m in records
+        if m["stream"] == "simple_price"
+    ]
+    assert len(markets) == len(set(markets)) == 1100
+    assert len(prices) == len(set(prices)) == 2 * 1100
+    requests = [path.split("?")[0] for path in settings.attempts if "ids=" in path]
+    assert requests.count("/api/v3/coins/markets") >= 5
+    assert requests.count("/api/v3/simple/price") >= 3
+
+
+def test_rate_limited_requests_are_retried():
+    settings = MockSettings(coins=20, fail_every=10)
+    counts = sync_all(settings)
+
+    assert counts == sync_all(MockSettings(coins=20))
+    assert settings.requests > sum(1 for _ in STREAM_PARAMS)
+
+
+def test_dropped_connections_fall_back_to_the_sdk_retry():
+    pytest.importorskip("aiohttp")
+    stream_name = "coin_historical_data_chart_by_id_hourly"
+
+    def records(settings: MockSettings) -> list[dict]:
+        with MockCoingecko(settings) as server:
+            config = {**base_config(server.api_url), "request_engine": "asyncio"}
+            tap = TapCoingecko(config=config, parse_env_config=False)
+            messages = sync_messages(tap, [stream_name])
+        return [m["record"] for m in messages if m["type"] == "RECORD"]
+
+    # aiohttp resends a request once itself, so the second drop reaches the tap.
+    assert records(MockSettings(coins=20, drops=2)) == records(MockSettings(coins=20))
+
+
+def test_tickers_come_with_coin_data():
+    settings = MockSettings(coins=20, tickers_per_coin=50)
+    with MockCoingecko(settings) as server:
+        tap = TapCoingecko(config=base_config(server.api_url), parse_env_config=False)
+        sync_messages(tap, ["coin_data_by_id"])
+        requests_for_coin_data = settings.requests
+        messages = sync_messages(tap, ["coin_tickers_by_id"])
+
+    tickers = [m for m in messages if m["type"] == "RECORD"]
+    assert len(tickers) == 3 * 50
+    assert settings.requests == requests_for_coin_data
+    assert len(tap.shared_payloads) == 0
+
+
+def test_snapshot_streams_are_polled_until_stopped():
+    with MockCoingecko(MockSettings(coins=20)) as server:
+        config = {**base_config(server.api_url), "poll_interval": 1, "poll_offset": 0}
+        tap = TapCoingecko(config=config, parse_env_config=False)
+        threading.Timer(2.5, tap.stop_polling.set).start()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            tap.poll_snapshot_streams()
+
+    polled = [
+        json.loads(line)["stream"]
+        for line in output.getvalue().splitlines()
+        if json.loads(line)["type"] == "SCHEMA"
+    ]
+    assert sorted(set(polled)) == [
+        "coins_list_with_market_data",
+        "recently_added_coins",
+        "top_gainers_losers",
+    ]
+    assert len(polled) >= 6
+
+
+def test_coverage_syncs_do_not_repeat_points():
+    stream_name = "coin_historical_data_chart_by_id_hourly"
+    with MockCoingecko(MockSettings(coins=20)) as server:
+        config = {**base_config(server.api_url), "track_coverage": True}
+        state: dict = {}
+        runs = []
+        for _ in range(2):
+            tap = TapCoingecko(
+                config=config, state=copy.deepcopy(state), parse_env_config=False
+            )
+            messages = sync_messages(tap, [stream_name])
+            state = tap.state
+            runs.append(
+                {
+                    (m["record"]["id"], m["record"]["timestamp"])
+                    for m in messages
+                    if m["type"] == "RECORD"
+                }
+            )
+
+    first, second = runs
+    assert len(first) > 3 * 24
+    assert not first & second
+
+
+def test_repairing_old_gaps_keeps_the_bookmark(monkeypatch):
+    stream_name = "coin_historical_data_chart_by_id_hourly"
+    with MockCoingecko(MockSettings(coins=2)) as server:
+        config = {**base_config(server.api_url), "track_coverage": True}
+        tap = TapCoingecko(config=config, parse_env_config=False)
+        sync_messages(tap, [stream_name])
+        state = copy.deepcopy(tap.state)
+        partitions = state["bookmarks"][stream_name]["partitions"]
+        bookmarks = {p["context"]["id"]: p["replication_key_value"] for p in partitions}
+        for partition in partitions:
+            partition["covered"] = []
+
+        tap = TapCoingecko(config=config, state=state, parse_env_config=False)
+        monkeypatch.setattr(tap.streams[stream_name], "STATE_MSG_FREQUENCY", 1)
+        messages = sync_messages(tap, [stream_name])
+
+    assert sum(m["type"] == "RECORD" for m in messages) > 3 * 24
+    for message in messages:
+        if message["type"] == "STATE":
+            for partition in message["value"]["bookmarks"][stream_name]["partitions"]:
+                assert partition["replication_key_value"] == (
+                    bookmarks[partition["context"]["id"]]
+                )
+
+
+def test_naive_coverage_start_date_is_utc(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        start = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(days=3)
+        config = {
+            **base_config("http://localhost"),
+            "track_coverage": True,
+            "start_date": start.replace(tzinfo=None).isoformat(),
+        }
+        tap = TapCoingecko(config=config, parse_env_config=False)
+        stream = tap.streams["coin_historical_data_chart_by_id_5m"]
+        gaps, _ = stream.get_coverage_plan({"id": "bitcoin"})
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
+
+    assert gaps[0][0] == start.timestamp()
+
+
+def test_recorded_syncs_replay_without_the_api(tmp_path):
+    def records(config: dict) -> list[dict]:
+        messages = sync_messages(TapCoingecko(config=config, parse_env_config=False))
+        return [(m["stream"], m["record"]) for m in messages if m["type"] == "RECORD"]
+
+    archive = {"archive_dir": str(tmp_path)}
+    with MockCoingecko(MockSettings(coins=20, tickers_per_coin=120)) as server:
+        config = base_config(server.api_url)
+        recorded = records({**config, **archive, "archive_mode": "record"})
+
+    # The server is gone, so any request would fail.
+    replayed = records({**config, **archive, "archive_mode": "replay"})
+
+    assert replayed == recorded
+    assert {stream for stream, _ in replayed} == set(STREAM_PARAMS)
+
+
+def test_deselected_coin_data_is_not_requested_or_emitted():
+    deselected = {"localization", "market_data", "tickers"}
+    with MockCoingecko(MockSettings(coins=20)) as server:
+        config = base_config(server.api_url)
+        catalog = TapCoingecko(config=config, parse_env_config=False).catalog_dict
+        for entry in catalog["streams"]:
+            for metadata in entry["metadata"]:
+                selected = entry["tap_stream_id"] == "coin_data_by_id" and not (
+                    set(metadata["breadcrumb"]) & deselected
+                )
+                metadata["metadata"]["selected"] = selected
+        tap = TapCoingecko(config=config, catalog=catalog, parse_env_config=False)
+        messages = sync_messages(tap, ["coin_data_by_id"])
+
+    url = tap.streams["coin_data_by_id"].get_url({"id": "bitcoin"})
+    assert "localization=false" in url and "market_data=false" in url
+    assert "tickers=false" in url and "community_data" not in url
+    records = [m["record"] for m in messages if m["type"] == "RECORD"]
+    assert len(records) == 3
+    assert all(r["id"] and not deselected & r.keys() for r in records)
+
+
+@pytest.mark.parametrize("vectorized_decode", [False, True])
+def test_fast_emit_writes_what_the_sdk_writes(vectorized_decode):
+    streams = [
+        "coin_historical_data_chart_by_id_hourly",
+        "coin_ohlc_chart_by_id",
+        "coin_circulating_supply_chart_by_id",
+    ]
+    if vectorized_decode:
+        pytest.importorskip("numpy")
+    pytest.importorskip("orjson")
+
+    def messages(config: dict) -> list[dict]:
+        tap = TapCoingecko(config=config, parse_env_config=False)
+        return [
+            {k: v for k, v in message.items() if k != "time_extracted"}
+            for message in sync_messages(tap, streams)
+        ]
+
+    with MockCoingecko(MockSettings(coins=20)) as server:
+        config = {
+            **base_config(server.api_url),
+            "vectorized_decode": vectorized_decode,
+        }
+        expected = messages(config)
+        fast = messages({**config, "fast_emit": True})
+
+    assert fast == expected
+    assert sum(m["type"] == "RECORD" for m in fast) > 1000
+
+
+def test_fast_emit_leaves_full_table_state_alone():
+    pytest.importorskip("orjson")
+    config = {**base_config("http://localhost"), "fast_emit": True}
+    tap = TapCoingecko(config=config, parse_env_config=False)
+    stream = tap.streams["coin_historical_data_chart_by_id_hourly"]
+    stream.forced_replication_method = "FULL_TABLE"
+    context = {"id": "bitcoin"}
+
+    stream._increment_stream_state({"timestamp": datetime(2024, 1, 1)}, context=context)
+
+    assert "replication_key_value" not in stream.get_context_state(context)
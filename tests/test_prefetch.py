@@ -0,0 +1,68 @@
+"""Tests for ordered partition prefetching."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tap_coingecko.prefetch import PartitionPrefetcher
+
+
+def test_results_come_back_in_partition_order():
+    contexts = [{"id": f"coin{i}"} for i in range(10)]
+    prepared_on = set()
+
+    def prepare(context):
+        prepared_on.add(threading.current_thread().name)
+        return [context["id"]]
+
+    def fetch(request, context):
+        # Later partitions finish first to prove ordering is preserved.
+        time.sleep(0.01 * (10 - int(request[4:])))
+        return request
+
+    prefetcher = PartitionPrefetcher(
+        contexts, prepare, fetch, ThreadPoolExecutor(max_workers=4), window=8
+    )
+    results = [prefetcher.take(context)[0][1].result() for context in contexts]
+
+    assert results == [context["id"] for context in contexts]
+    assert prepared_on == {threading.current_thread().name}
+    assert prefetcher.finished
+
+
+def test_out_of_order_context_closes_prefetcher():
+    contexts = [{"id": "bitcoin"}, {"id": "ethereum"}]
+    prefetcher = PartitionPrefetcher(
+        contexts, lambda c: [c["id"]], lambda r, c: r, ThreadPoolExecutor(), window=2
+    )
+
+    assert prefetcher.take({"id": "ethereum"}) is None
+    assert prefetcher.finished
+
+
+def test_partition_with_several_requests_keeps_request_order():
+    contexts = [{"id": "bitcoin"}, {"id": "ethereum"}]
+    prefetcher = PartitionPrefetcher(
+        contexts,
+        lambda c: [f"{c['id']}-{window}" for window in range(3)],
+        lambda r, c: r,
+        ThreadPoolExecutor(max_workers=3),
+        window=2,
+    )
+
+    futures = prefetcher.take({"id": "bitcoin"})
+    assert [f.result() for _, f in futures] == ["bitcoin-0", "bitcoin-1", "bitcoin-2"]
+
+
+def test_partitions_without_requests_can_be_skipped():
+    contexts = [{"id": "bitcoin"}, {"id": "current"}, {"id": "ethereum"}]
+    prefetcher = PartitionPrefetcher(
+        contexts,
+        lambda c: [] if c["id"] == "current" else [c["id"]],
+        lambda r, c: r,
+        ThreadPoolExecutor(),
+        window=2,
+    )
+
+    assert prefetcher.take({"id": "bitcoin"})[0][1].result() == "bitcoin"
+    assert prefetcher.take({"id": "ethereum"})[0][1].result() == "ethereum"
@@ -0,0 +1,45 @@
+"""Tests for the tap-wide token bucket."""
+
+import pytest
+
+from tap_coingecko.rate_limit import TokenBucket, retry_after_seconds
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_plan_defaults_and_overrides():
+    assert TokenBucket.from_config({"subscription_level": "Demo"}).rate == 0.5
+    assert TokenBucket.from_config({"subscription_level": "pro"}).rate == 1000 / 60
+    bucket = TokenBucket.from_config(
+        {"subscription_level": "demo", "rate_limit_per_minute": 120}
+    )
+    assert bucket.rate == 2
+
+
+def test_burst_then_steady_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(60, burst=2, clock=clock)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(1)
+    assert bucket.reserve() == pytest.approx(2)
+
+    clock.now += 10
+    assert bucket.reserve() == 0
+
+
+def test_429_pauses_every_caller():
+    clock = FakeClock()
+    bucket = TokenBucket(60, burst=5, clock=clock)
+
+    bucket.observe(429, {"retry-after": "3"})
+
+    assert bucket.reserve() == pytest.approx(4)
+    assert retry_after_seconds({}) is None
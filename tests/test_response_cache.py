@@ -0,0 +1,57 @@
+"""Tests for the on-disk response cache."""
+
+from datetime import datetime, timezone
+
+import requests
+
+from tap_coingecko.response_cache import ResponseCache, expires_at, normalize_url
+
+NOW = datetime(2024, 5, 1, 12, 2, tzinfo=timezone.utc).timestamp()
+URL = "https://api.example/api/v3/coins/bitcoin/market_chart"
+
+
+def make_response(body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["total"] = "1"
+    response.headers["x-ratelimit-remaining"] = "5"
+    response._content = body
+    return response
+
+
+def test_entries_expire_with_the_upstream_refresh_schedule():
+    assert normalize_url(f"{URL}?b=2&a=1") == normalize_url(f"{URL}?a=1&b=2")
+    assert expires_at(f"{URL}?days=1", NOW) == NOW + 180
+    finished_day = datetime(2024, 4, 30, tzinfo=timezone.utc).timestamp()
+    assert expires_at(f"{URL}/range?to={finished_day}", NOW) > NOW + 86400
+    assert expires_at(f"{URL}/range?to={NOW}", NOW) == NOW + 180
+
+
+def test_history_snapshots_are_final_once_their_day_is_published():
+    history = "https://api.example/api/v3/coins/bitcoin/history"
+    assert expires_at(f"{history}?date=30-04-2024", NOW) > NOW + 86400
+    assert expires_at(f"{history}?date=01-05-2024", NOW) == NOW + 180
+    # Yesterday only closes at 00:35 UTC.
+    just_after_midnight = datetime(2024, 5, 1, 0, 10, tzinfo=timezone.utc).timestamp()
+    assert expires_at(f"{history}?date=30-04-2024", just_after_midnight) == (
+        just_after_midnight + 300
+    )
+
+
+def test_cache_round_trip_expiry_and_eviction(tmp_path):
+    now = [NOW]
+    cache = ResponseCache(tmp_path, max_bytes=10**6, clock=lambda: now[0])
+    cache.put(f"{URL}?days=1&vs_currency=usd", make_response(b'{"prices": []}'))
+
+    cached = cache.get(f"{URL}?vs_currency=usd&days=1")
+    assert cached.json() == {"prices": []}
+    assert dict(cached.headers) == {"total": "1"}
+
+    now[0] += 300
+    assert cache.get(f"{URL}?days=1&vs_currency=usd") is None
+
+    cache.max_bytes = 1
+    cache.put(f"{URL}?days=1", make_response(b"[1]"))
+    cache.put(f"{URL}?days=2", make_response(b"[2]"))
+    assert cache.get(f"{URL}?days=1") is None
+    assert cache.get(f"{URL}?days=2").json() == [2]
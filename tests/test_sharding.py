@@ -0,0 +1,66 @@
+"""Tests for sharding coins across processes."""
+
+from __future__ import annotations
+
+from tap_coingecko.sharding import merge_states
+from tap_coingecko.tap import TapCoingecko
+
+IDS = [f"coin-{i}" for i in range(200)]
+
+
+def shard_partitions(shard_index: int, shard_count: int) -> list[str]:
+    config = {
+        "api_key": "test",
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "stream_params": {"coin_data_by_id": {"ids": ",".join(IDS)}},
+    }
+    tap = TapCoingecko(config=config, parse_env_config=False)
+    return [p["id"] for p in tap.streams["coin_data_by_id"].partitions]
+
+
+def test_shards_split_the_ids():
+    shards = [shard_partitions(i, 4) for i in range(4)]
+    assert sorted(sum(shards, [])) == sorted(IDS)
+    assert all(30 < len(shard) < 70 for shard in shards)
+    assert shards[0] == shard_partitions(0, 4)
+
+
+def test_merged_state_keeps_the_latest_bookmarks():
+    def state(bitcoin: str, ethereum: str, covered: list) -> dict:
+        return {
+            "bookmarks": {
+                "chart": {
+                    "partitions": [
+                        {
+                            "context": {"id": "bitcoin"},
+                            "replication_key_value": bitcoin,
+                            "covered": covered,
+                        },
+                        {
+                            "context": {"id": "ethereum"},
+                            "replication_key_value": ethereum,
+                        },
+                    ]
+                }
+            }
+        }
+
+    merged = merge_states(
+        [
+            state("2024-01-02T00:00:00+00:00", "2024-01-01T00:00:00+00:00", [[0, 10]]),
+            state("2024-01-01T00:00:00+00:00", "2024-01-03T00:00:00+00:00", [[5, 20]]),
+        ]
+    )
+
+    assert merged["bookmarks"]["chart"]["partitions"] == [
+        {
+            "context": {"id": "bitcoin"},
+            "replication_key_value": "2024-01-02T00:00:00+00:00",
+            "covered": [[0, 20]],
+        },
+        {
+            "context": {"id": "ethereum"},
+            "replication_key_value": "2024-01-03T00:00:00+00:00",
+        },
+    ]
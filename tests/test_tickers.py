@@ -0,0 +1,39 @@
+"""Tests for flattening coin tickers into per-market rows."""
+
+import copy
+
+from tap_coingecko.tap import TapCoingecko
+from tests.mock_server import FIXTURES
+
+CONFIG = {"api_key": "test", "stream_params": {}}
+
+
+def test_tickers_are_flattened_into_schema_columns():
+    tap = TapCoingecko(config=CONFIG, parse_env_config=False)
+    stream = tap.streams["coin_tickers_by_id"]
+    result = copy.deepcopy(FIXTURES["coin_tickers"])
+
+    [row] = stream.parse_tickers(result, {"id": "bitcoin"})
+
+    assert {key: row[key] for key in stream.primary_keys} == {
+        "id": "bitcoin",
+        "market_identifier": "binance",
+        "base": "BTC",
+        "target": "USDT",
+    }
+    assert row["name"] == "Bitcoin"
+    assert row["market_name"] == "Binance"
+    assert row["market_has_trading_incentive"] is False
+    assert row["market_logo"].endswith("/binance.jpg")
+    assert (
+        row["converted_last_btc"],
+        row["converted_last_eth"],
+        row["converted_last_usd"],
+    ) == (1.000205, 20.291404, 67220)
+    assert (
+        row["converted_volume_btc"],
+        row["converted_volume_eth"],
+        row["converted_volume_usd"],
+    ) == (17234, 349634, 1158257302)
+    assert not {"market", "converted_last", "converted_volume"} & row.keys()
+    assert row.keys() <= stream.schema["properties"].keys()